@@ -21,11 +21,15 @@ AGENT_DESCRIPTION = 'T-Mobile Product Sentiment Weekly Digest Agent'
 # Pinecone Configuration
 PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
 PINECONE_INDEX_NAME = os.getenv('PINECONE_INDEX_NAME', 'ttime-sentiment')
+# Candidates fetched per requested result; a wider ANN search improves recall of the top matches
+PINECONE_TOPK_OVERSAMPLE = int(os.getenv('PINECONE_TOPK_OVERSAMPLE', '3'))
 
 # Email Configuration (using Resend)
 EMAIL_RECIPIENT = os.getenv('EMAIL_RECIPIENT')  # Fallback if database is empty
 EMAIL_SENDER = os.getenv('EMAIL_SENDER')  # Must be a verified domain in Resend
 RESEND_API_KEY = os.getenv('RESEND_API_KEY')
+# Recipients per email, sent as BCC (set to 1 to send one email per recipient)
+EMAIL_BCC_BATCH_SIZE = int(os.getenv('EMAIL_BCC_BATCH_SIZE', '50'))
 
 # Database Configuration
 DATABASE_URL = os.getenv('DATABASE_URL')  # PostgreSQL connection string
@@ -44,11 +48,13 @@ Your primary responsibilities:
 3. **Email Delivery**: Send the completed digest via email using the send_weekly_digest_email tool
 
 Workflow:
-1. Query Pinecone for recent customer sentiment data (last 7 days) using various queries:
+1. Plan all of your queries up front, then issue a single index_pinecone_batch call with every query
+   theme (typically 6-8 queries, timeframe_days=7):
    - General T-Mobile sentiment queries
    - Product/service-specific queries (plans, network, customer service, etc.)
    - Trending topic queries
-2. For each query:
+   Only make a follow-up batch call if the first results reveal a topic that needs more coverage.
+2. For each query result:
    - Analyze sentiment data from all platforms
    - Extract key themes and patterns
    - Identify notable complaints and praises
@@ -64,6 +70,7 @@ Workflow:
 Best practices:
 - Focus on sentiment data from the last 7 days
 - Use diverse semantic search queries to capture different aspects of customer feedback
+- Prefer one index_pinecone_batch call over many single queries
 - Aggregate sentiment across all platforms for comprehensive view
 - Include specific examples with URLs when relevant
 - Quantify findings with percentages and scores
@@ -7,10 +7,13 @@ Can be run manually or scheduled via cron/systemd.
 """
 
 import asyncio
+import base64
+import html
 import sys
 import os
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -20,6 +23,17 @@ import asyncio
 import config
 
 
+def _digest_header(generated: datetime) -> str:
+    """
+    Header written above the digest in the saved file and the email attachment.
+    """
+    return (
+        "Weekly T-Mobile Product Sentiment Digest\n"
+        f"Generated: {generated.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        + "="*80 + "\n\n"
+    )
+
+
 async def run_digest_and_save():
     """
     Generate the weekly digest and save it to a file.
@@ -32,7 +46,7 @@ async def run_digest_and_save():
         prompt = """Generate a weekly digest of user sentiments based on the most recent T-Mobile customer feedback.
 
 Please follow these steps:
-1. Use index_pinecone to query for recent customer sentiment data (last 7 days). Try multiple queries to get comprehensive coverage:
+1. Plan your queries, then call index_pinecone_batch ONCE with all of them (timeframe_days=7) to get comprehensive coverage:
    - Query for general T-Mobile sentiment
    - Query for specific products/services (e.g., "Go5G", "5G network", "customer service", "billing")
    - Query for trending topics
@@ -45,7 +59,7 @@ Please follow these steps:
    - Trends and patterns identified
    - Actionable insights and recommendations
 
-3. After generating the digest, use the send_weekly_digest_email tool to send it via email.
+3. After generating the digest, use the send_weekly_digest_email tool once to send it via email.
 
 Format the digest in a clear, professional manner suitable for business stakeholders."""
         
@@ -64,15 +78,11 @@ Format the digest in a clear, professional manner suitable for business stakehol
         output_dir = Path(__file__).parent / "digests"
         output_dir.mkdir(exist_ok=True)
         
-        # Save to file with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = output_dir / f"digest_{timestamp}.txt"
+        # Save to file with timestamp (header and digest encoded and written in one go)
+        now = datetime.now()
+        filename = output_dir / f"digest_{now.strftime('%Y%m%d_%H%M%S')}.txt"
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"Weekly T-Mobile Product Sentiment Digest\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("="*80 + "\n\n")
-            f.write(digest)
+        filename.write_bytes((_digest_header(now) + digest).encode('utf-8'))
         
         print(f"[{datetime.now()}] Digest saved to: {filename}")
         
@@ -86,9 +96,12 @@ Format the digest in a clear, professional manner suitable for business stakehol
         raise
 
 
-async def send_email_digest(digest: str, filepath: Path):
+async def send_email_digest(digest: str, filepath: Path, generated: Optional[datetime] = None):
     """
     Send the digest via email using Resend if email configuration is available.
+
+    Pass the time the digest file was saved as `generated` so the email and its
+    attachment carry the same timestamp as the file.
     """
     try:
         import resend
@@ -100,27 +113,29 @@ async def send_email_digest(digest: str, filepath: Path):
         # Initialize Resend
         resend.api_key = config.RESEND_API_KEY
         
-        # Read attachment file
-        with open(filepath, 'rb') as f:
-            attachment_content = f.read()
+        if generated is None:
+            generated = datetime.now()
+        
+        # Encode the attachment from memory instead of reading the saved file back
+        attachment_content = base64.b64encode((_digest_header(generated) + digest).encode('utf-8')).decode('ascii')
         
         # Send email via Resend
         params = {
             "from": config.EMAIL_SENDER,
             "to": [config.EMAIL_RECIPIENT],
-            "subject": f"T-Mobile Product Sentiment Weekly Digest - {datetime.now().strftime('%Y-%m-%d')}",
+            "subject": f"T-Mobile Product Sentiment Weekly Digest - {generated.strftime('%Y-%m-%d')}",
             "html": f"""<html>
 <body>
 <h2>Weekly T-Mobile Product Sentiment Digest</h2>
-<p><strong>Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-<pre style="white-space: pre-wrap; font-family: monospace;">{digest}</pre>
+<p><strong>Generated:</strong> {generated.strftime('%Y-%m-%d %H:%M:%S')}</p>
+<pre style="white-space: pre-wrap; font-family: monospace;">{html.escape(digest)}</pre>
 <hr>
 <p><em>This is an automated weekly digest from the T-Mobile Product Sentiment Analysis Agent.</em></p>
 </body>
 </html>""",
             "text": f"""Weekly T-Mobile Product Sentiment Digest
 
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Generated: {generated.strftime('%Y-%m-%d %H:%M:%S')}
 
 {digest}
 
@@ -0,0 +1,77 @@
+"""
+Sentiment aggregation kernel for the T-Mobile Product Digest Agent
+
+Uses Numba to JIT-compile the aggregation loop when it is installed,
+falling back to the same pure-Python loop otherwise.
+"""
+
+from typing import Iterable, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        def decorator(func):
+            return func
+        return decorator
+
+# Integer codes for sentiment labels (anything else is LABEL_OTHER)
+LABEL_POSITIVE = 0
+LABEL_NEGATIVE = 1
+LABEL_NEUTRAL = 2
+LABEL_OTHER = 3
+
+LABEL_CODES = {
+    "POSITIVE": LABEL_POSITIVE,
+    "NEGATIVE": LABEL_NEGATIVE,
+    "NEUTRAL": LABEL_NEUTRAL,
+}
+
+
+def encode_labels(labels: Iterable[str], count: int = -1) -> np.ndarray:
+    """Encodes sentiment labels as an int8 array of label codes."""
+    return np.fromiter(
+        (LABEL_CODES.get(label, LABEL_OTHER) for label in labels),
+        dtype=np.int8,
+        count=count
+    )
+
+
+@njit(cache=True)
+def _aggregate(scores, label_codes):
+    """Counts positive/negative/neutral labels and sums scores in one pass."""
+    positive = 0
+    negative = 0
+    neutral = 0
+    score_sum = 0.0
+    for i in range(scores.shape[0]):
+        code = label_codes[i]
+        if code == LABEL_POSITIVE:
+            positive += 1
+        elif code == LABEL_NEGATIVE:
+            negative += 1
+        elif code == LABEL_NEUTRAL:
+            neutral += 1
+        score_sum += scores[i]
+    return positive, negative, neutral, score_sum
+
+
+def aggregate_sentiment(scores: np.ndarray, label_codes: np.ndarray) -> Tuple[int, int, int, float]:
+    """
+    Aggregates sentiment scores and label codes.
+
+    Args:
+        scores: float32 array of sentiment scores
+        label_codes: int8 array of label codes (see encode_labels)
+
+    Returns:
+        Tuple of (positive_count, negative_count, neutral_count, score_sum)
+    """
+    positive, negative, neutral, score_sum = _aggregate(scores, label_codes)
+    return int(positive), int(negative), int(neutral), float(score_sum)
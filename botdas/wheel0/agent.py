@@ -7,7 +7,7 @@ This agent provides customer sentiment analysis for T-Mobile using MCP tools.
 from google.adk.agents.llm_agent import Agent
 from google.adk.tools import MCPToolset
 from google.adk.tools.mcp import StdioServerParams
-import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
 import os
 import sys
 
@@ -15,66 +15,78 @@ import sys
 from . import config
 
 
-async def create_agent():
+def load_in_process_tools(mcp_path: str) -> list:
     """
-    Create and initialize the sentiment analysis agent with MCP tools.
-
-    Returns:
-        Agent: Configured agent with MCP toolset
+    Import the MCP tool functions directly so ADK calls them as function tools,
+    skipping the stdio subprocess and JSON round-trip per call.
     """
-
-    # Get the path to the MCP server
-    # Assuming botdas/ and mcp/ are siblings in the project root
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    mcp_server_path = os.path.join(project_root, 'mcp', 'server.py')
-
-    # Initialize MCP toolset with stdio connection
-    tools, exit_stack = await MCPToolset.from_server(
-        connection_params=StdioServerParams(
-            command=config.MCP_SERVER_COMMAND,
-            args=[mcp_server_path],
-            env={
-                'PYTHONPATH': os.path.join(project_root, 'mcp'),
-                **os.environ  # Inherit current environment
-            }
-        )
-    )
-
-    # Create agent with MCP tools
-    agent = Agent(
-        model=config.AGENT_MODEL,
-        name=config.AGENT_NAME,
-        description=config.AGENT_DESCRIPTION,
-        instruction=config.AGENT_INSTRUCTION,
-        tools=tools
+    if mcp_path not in sys.path:
+        sys.path.append(mcp_path)
+    from tools import (
+        search_sentiment,
+        get_sentiment_summary,
+        compare_sentiment,
+        get_trending_topics,
+        fetch_recent_posts,
     )
+    return [
+        search_sentiment,
+        get_sentiment_summary,
+        compare_sentiment,
+        get_trending_topics,
+        fetch_recent_posts,
+    ]
 
-    return agent, exit_stack
 
+@asynccontextmanager
+async def agent_session():
+    """
+    Create the sentiment analysis agent with MCP tools for the duration of a block.
 
-# For backward compatibility and simple imports
-# Note: This will be None until initialized asynchronously
-root_agent = None
+    Tools come from the MCP server over stdio, or are imported in-process when
+    config.USE_STDIO is False. The MCP server connection is closed when the block
+    exits. A single session can serve many queries concurrently:
 
+        async with agent_session() as agent:
+            await agent.run(query)
+            # or: await asyncio.gather(*[agent.run(q) for q in queries])
 
-async def init_agent():
-    """
-    Initialize the root agent asynchronously.
-    Call this before using the agent.
+    Yields:
+        Agent: Configured agent with MCP toolset
     """
-    global root_agent
-    if root_agent is None:
-        root_agent, _ = await create_agent()
-    return root_agent
 
-
-# Helper function for synchronous initialization (if needed)
-def get_agent():
-    """
-    Get the initialized agent. Must be called within an async context.
-    """
-    if root_agent is None:
-        raise RuntimeError(
-            "Agent not initialized. Call 'await init_agent()' first."
+    # Get the path to the MCP server
+    # Assuming botdas/ and mcp/ are siblings in the project root
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    mcp_path = os.path.join(project_root, 'mcp')
+    mcp_server_path = os.path.join(mcp_path, 'server.py')
+
+    instruction = config.AGENT_INSTRUCTION
+    if config.USE_STDIO:
+        # Initialize MCP toolset with stdio connection
+        tools, exit_stack = await MCPToolset.from_server(
+            connection_params=StdioServerParams(
+                command=config.MCP_SERVER_COMMAND,
+                args=[mcp_server_path],
+                env={
+                    'PYTHONPATH': mcp_path,
+                    **os.environ  # Inherit current environment
+                }
+            )
+        )
+        instruction += config.BACKGROUND_TOOLS_INSTRUCTION
+    else:
+        # Call the tool functions directly on this event loop
+        tools, exit_stack = load_in_process_tools(mcp_path), AsyncExitStack()
+
+    try:
+        # Create agent with MCP tools
+        yield Agent(
+            model=config.AGENT_MODEL,
+            name=config.AGENT_NAME,
+            description=config.AGENT_DESCRIPTION,
+            instruction=instruction,
+            tools=tools
         )
-    return root_agent
+    finally:
+        await exit_stack.aclose()
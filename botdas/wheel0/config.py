@@ -43,6 +43,8 @@ When answering questions:
 - Quantify findings with data whenever possible
 
 Best practices:
+- When a question needs several tools (e.g. semantic search, sentiment summary and trending topics),
+  request all of the independent tool calls in the same turn rather than one per turn; they run concurrently
 - Always verify your findings with multiple data points
 - Consider the time period when analyzing trends
 - Note which platform feedback comes from (Reddit users vs. formal reviews)
@@ -52,5 +54,14 @@ Best practices:
 Remember: Your goal is to help understand customer sentiment to improve T-Mobile's service.
 """
 
+# Appended to the instruction when tools are served by the MCP server (USE_STDIO)
+BACKGROUND_TOOLS_INSTRUCTION = """
+Background tool calls:
+- Every data tool accepts background=true, which starts the call and immediately returns a call_id
+- Start broad calls whose results you only need for the final summary in the background, then keep working
+- Some tasks may be running in the background: before giving your final answer, call await_results with
+  the pending call_ids listed in the tool responses and use those results
+"""
+
 # Connection Type
-USE_STDIO = True  # Set to False to use HTTP/SSE connection instead
+USE_STDIO = True  # Set to False to call the MCP tool functions in-process instead of via a stdio subprocess
@@ -4,14 +4,28 @@ Provides text embedding generation using the intfloat/e5-base-v2 model.
 This service replaces the Xenova/e5-base-v2 model that was running in Next.js serverless functions.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from sentence_transformers import SentenceTransformer
+import torch
 import logging
-from typing import List
+import os
+from typing import List, Literal, Optional
+from collections import OrderedDict
+import numpy as np
+import asyncio
+import hashlib
 import time
 
+# Optional shared cache
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -42,6 +56,98 @@ embedding_model = None
 MODEL_NAME = "intfloat/e5-base-v2"
 EMBEDDING_DIMENSION = 768
 
+# e5 input prefixes, prepended when a request sets input_type
+E5_PREFIXES = {"query": "query: ", "passage": "passage: "}
+
+# Inference precision: "auto" uses bfloat16 on GPUs that support it, float16 on
+# older GPUs and float32 on CPU; "bfloat16", "float16" or "float32" force a dtype
+EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "auto")
+
+# Compile the transformer with torch.compile (opt-in: inputs are not padded to fixed
+# lengths, so each new sequence length recompiles / captures a new graph on first use)
+ENABLE_TORCH_COMPILE = os.getenv("ENABLE_TORCH_COMPILE", "false").lower() == "true"
+
+# Dynamic int8 quantization of the transformer's Linear layers for float32 CPU inference
+# (opt-in: query vectors are matched against an index of float32 passage vectors); kept
+# only if every canary embedding stays within QUANTIZATION_MIN_COSINE of the float32 one
+ENABLE_INT8_QUANTIZATION = os.getenv("ENABLE_INT8_QUANTIZATION", "false").lower() == "true"
+QUANTIZATION_MIN_COSINE = 0.995
+QUANTIZATION_CANARY_TEXTS = [
+    "query: network coverage problems",
+    "query: why is my bill higher this month",
+    "query: 5G home internet keeps disconnecting",
+    "query: trade-in credit never showed up",
+    "passage: Switched carriers last week and the signal in my apartment is finally usable.",
+    "passage: Customer service kept transferring me between departments for two hours and nobody could fix the billing error.",
+    "passage: The new plan is cheaper but international roaming data is painfully slow.",
+    "passage: Store staff were friendly, activation took five minutes, no complaints so far.",
+]
+
+# Micro-batching configuration: concurrent /embed requests are coalesced into
+# one forward pass of up to MAX_BATCH_SIZE texts, waiting at most
+# MAX_BATCH_HOLD seconds for a batch to fill (tunable per deployment: larger
+# batches raise GPU utilization, longer holds add latency at low load)
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "32"))
+MAX_BATCH_HOLD = float(os.getenv("MAX_BATCH_HOLD_MS", "10")) / 1000
+
+# Maximum texts accepted by one /embed_batch request
+MAX_EMBED_BATCH_TEXTS = 256
+
+# Exact-match cache: blake2b(text) -> embedding, evicted least-recently-used
+EXACT_CACHE_SIZE = 10000
+_EXACT_CACHE: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+
+# Semantic cache: a ring buffer of recent embeddings; a new embedding whose
+# cosine similarity to a recent one is >= SEMANTIC_CACHE_THRESHOLD is answered
+# with the cached vector, so near-paraphrases map to identical downstream queries
+ENABLE_SEMANTIC_CACHE = os.getenv("ENABLE_SEMANTIC_CACHE", "false").lower() == "true"
+SEMANTIC_CACHE_SIZE = 1024
+SEMANTIC_CACHE_THRESHOLD = 0.97
+_recent_embs = np.zeros((SEMANTIC_CACHE_SIZE, EMBEDDING_DIMENSION), dtype=np.float16)
+_recent_results: List[Optional[np.ndarray]] = [None] * SEMANTIC_CACHE_SIZE
+_recent_next = 0
+
+# Redis cache shared by all workers and replicas: e5f32:<blake2b hex> -> float32 bytes
+# (full precision, so every cache tier returns the same vector as a fresh encode)
+ENABLE_REDIS_CACHE = os.getenv("ENABLE_REDIS_CACHE", "false").lower() == "true"
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_CACHE_TTL = 86400
+redis_client = None
+
+# Queue of (text, future) pairs consumed by the batch worker
+embedding_queue: Optional[asyncio.Queue] = None
+batch_worker_task: Optional[asyncio.Task] = None
+
+
+def resolve_dtype(device: str) -> torch.dtype:
+    """Resolve EMBEDDING_DTYPE to the torch dtype used for inference on the given device."""
+    if EMBEDDING_DTYPE != "auto":
+        return getattr(torch, EMBEDDING_DTYPE)
+    if device == "cuda":
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    return torch.float32
+
+
+def quantize_model(model: SentenceTransformer) -> bool:
+    """
+    Quantize the transformer's Linear layers to int8 in place, leaving pooling and
+    normalization in float32. Reverts and returns False if any canary text's
+    embedding drifts below QUANTIZATION_MIN_COSINE.
+    """
+    reference = model.encode(QUANTIZATION_CANARY_TEXTS, normalize_embeddings=True, convert_to_tensor=True)
+    fp32_model = model[0].auto_model
+    model[0].auto_model = torch.ao.quantization.quantize_dynamic(
+        fp32_model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    quantized = model.encode(QUANTIZATION_CANARY_TEXTS, normalize_embeddings=True, convert_to_tensor=True)
+    cosine = float((reference * quantized).sum(dim=1).min())
+    if cosine < QUANTIZATION_MIN_COSINE:
+        logger.warning(f"int8 minimum canary cosine {cosine:.4f} below {QUANTIZATION_MIN_COSINE}, keeping float32 weights")
+        model[0].auto_model = fp32_model
+        return False
+    logger.info(f"Quantized model to int8 (minimum canary cosine {cosine:.4f})")
+    return True
+
 
 def get_embedding_model():
     """
@@ -52,23 +158,235 @@ def get_embedding_model():
     if embedding_model is None:
         logger.info(f"Loading embedding model: {MODEL_NAME}")
         start_time = time.time()
-        embedding_model = SentenceTransformer(MODEL_NAME)
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        dtype = resolve_dtype(device)
+        embedding_model = SentenceTransformer(MODEL_NAME, device=device)
+        embedding_model = embedding_model.to(dtype=dtype, device=device)
+        if ENABLE_INT8_QUANTIZATION and device == "cpu" and dtype == torch.float32:
+            quantize_model(embedding_model)
+        compiled = False
+        if ENABLE_TORCH_COMPILE:
+            eager_model = embedding_model[0].auto_model
+            try:
+                embedding_model[0].auto_model = torch.compile(
+                    eager_model,
+                    mode="reduce-overhead",
+                    fullgraph=False
+                )
+                # Compile on a warm-up batch instead of on the first request
+                embedding_model.encode(QUANTIZATION_CANARY_TEXTS[:1], show_progress_bar=False)
+                compiled = True
+            except Exception as e:
+                embedding_model[0].auto_model = eager_model
+                logger.warning(f"torch.compile failed, using eager model: {e}")
+        logger.info(f"Model running on {device} with dtype {dtype} (compiled: {compiled})")
         load_time = time.time() - start_time
         logger.info(f"Model loaded successfully in {load_time:.2f} seconds")
     return embedding_model
 
 
+def encode_batch(texts: List[str]):
+    """
+    Encode a batch of texts in a single forward pass.
+    Returns a numpy array with one normalized embedding per row.
+    """
+    model = get_embedding_model()
+    with torch.inference_mode():
+        embeddings = model.encode(
+            texts,
+            batch_size=MAX_BATCH_SIZE,
+            normalize_embeddings=True,  # Same as Xenova version
+            show_progress_bar=False,
+            convert_to_tensor=True
+        )
+    # Upcast half-precision outputs so the JSON response keeps float32 values
+    return embeddings.float().cpu().numpy()
+
+
+async def batch_worker():
+    """
+    Drain the embedding queue into batches and resolve each request's future.
+    A batch is dispatched once it holds MAX_BATCH_SIZE texts or MAX_BATCH_HOLD
+    has passed since its first text arrived.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await embedding_queue.get()]
+        deadline = loop.time() + MAX_BATCH_HOLD
+        while len(batch) < MAX_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(embedding_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        texts = [text for text, _ in batch]
+        try:
+            start_time = time.time()
+            embeddings = await asyncio.to_thread(encode_batch, texts)
+            logger.info(
+                f"Encoded batch of {len(texts)} texts in {time.time() - start_time:.3f}s"
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+
+def cache_key(text: str) -> bytes:
+    """Exact-match cache key for a text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def exact_cache_get(key: bytes) -> Optional[np.ndarray]:
+    """Look up an embedding in the exact-match cache, refreshing its recency."""
+    embedding = _EXACT_CACHE.get(key)
+    if embedding is not None:
+        _EXACT_CACHE.move_to_end(key)
+    return embedding
+
+
+def exact_cache_set(key: bytes, embedding: np.ndarray):
+    """Store an embedding in the exact-match cache, evicting the oldest entry when full."""
+    _EXACT_CACHE[key] = embedding
+    _EXACT_CACHE.move_to_end(key)
+    if len(_EXACT_CACHE) > EXACT_CACHE_SIZE:
+        _EXACT_CACHE.popitem(last=False)
+
+
+def semantic_cache_lookup(embedding: np.ndarray) -> np.ndarray:
+    """
+    Return a recent embedding within SEMANTIC_CACHE_THRESHOLD of this one,
+    or record this embedding in the ring buffer and return it unchanged.
+    """
+    global _recent_next
+    sims = _recent_embs @ embedding.astype(np.float16)
+    best = int(np.argmax(sims))
+    if sims[best] >= SEMANTIC_CACHE_THRESHOLD and _recent_results[best] is not None:
+        return _recent_results[best]
+    _recent_embs[_recent_next] = embedding
+    _recent_results[_recent_next] = embedding
+    _recent_next = (_recent_next + 1) % SEMANTIC_CACHE_SIZE
+    return embedding
+
+
+def embedding_response(embedding: np.ndarray) -> ORJSONResponse:
+    """
+    Build the /embed JSON response. orjson serializes the float32 array
+    directly, skipping the tolist() copy and Pydantic validation.
+    """
+    return ORJSONResponse({
+        "embedding": embedding,
+        "dimension": len(embedding),
+        "model": MODEL_NAME
+    })
+
+
+def embedding_binary_response(embedding: np.ndarray) -> Response:
+    """
+    Build a binary embedding response: the raw little-endian float16 vector,
+    with its dimension and dtype in headers.
+    """
+    return Response(
+        content=embedding.astype("<f2").tobytes(),
+        media_type="application/octet-stream",
+        headers={"X-Emb-Dim": str(len(embedding)), "X-Emb-Dtype": "float16"}
+    )
+
+
+async def compute_embedding(text: str) -> np.ndarray:
+    """
+    Get the embedding for a text from the cache, or from the batch worker on a miss.
+    """
+    # Serve repeated texts from the exact-match cache
+    key = cache_key(text)
+    embedding = exact_cache_get(key)
+    if embedding is not None:
+        return embedding
+
+    # Then the Redis cache shared with other workers
+    redis_key = f"e5f32:{key.hex()}"
+    if redis_client is not None:
+        try:
+            raw = await redis_client.get(redis_key)
+            if raw:
+                embedding = np.frombuffer(raw, dtype="<f4").astype(np.float32)
+                exact_cache_set(key, embedding)
+                return embedding
+        except Exception as e:
+            logger.warning(f"Redis cache read failed: {str(e)}")
+
+    # Queue the text for the batch worker and wait for its embedding
+    start_time = time.time()
+    future = asyncio.get_running_loop().create_future()
+    await embedding_queue.put((text, future))
+    embedding = await future
+    inference_time = time.time() - start_time
+
+    if ENABLE_SEMANTIC_CACHE:
+        embedding = semantic_cache_lookup(embedding)
+    exact_cache_set(key, embedding)
+
+    if redis_client is not None:
+        try:
+            await redis_client.set(redis_key, embedding.astype("<f4").tobytes(), ex=REDIS_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Redis cache write failed: {str(e)}")
+
+    logger.info(
+        f"Generated embedding for text (length: {len(text)}) "
+        f"in {inference_time:.3f}s"
+    )
+    return embedding
+
+
 # Pydantic models for request/response
 class EmbedRequest(BaseModel):
     text: str
+    input_type: Optional[Literal["query", "passage"]] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "text": "network coverage problems",
+                "input_type": "query"
+            }
+        }
+
+    def prefixed_text(self) -> str:
+        """Text with the e5 prefix for input_type, unless it is already present."""
+        if self.input_type is None:
+            return self.text
+        prefix = E5_PREFIXES[self.input_type]
+        return self.text if self.text.startswith(prefix) else prefix + self.text
+
+
+class EmbedBatchRequest(BaseModel):
+    texts: List[str]
+    input_type: Optional[Literal["query", "passage"]] = None
 
     class Config:
         json_schema_extra = {
             "example": {
-                "text": "query: network coverage problems"
+                "texts": ["network coverage problems", "billing issues"],
+                "input_type": "query"
             }
         }
 
+    def prefixed_texts(self) -> List[str]:
+        """Texts with the e5 prefix for input_type, unless it is already present."""
+        if self.input_type is None:
+            return self.texts
+        prefix = E5_PREFIXES[self.input_type]
+        return [text if text.startswith(prefix) else prefix + text for text in self.texts]
+
 
 class EmbedResponse(BaseModel):
     embedding: List[float]
@@ -99,6 +417,8 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "embed": "POST /embed - Generate embeddings",
+            "embed_bin": "POST /embed_bin - Generate embeddings as raw float16 bytes",
+            "embed_batch": "POST /embed_batch - Generate embeddings for a list of texts",
             "health": "GET /health - Health check"
         }
     }
@@ -123,13 +443,14 @@ async def health_check():
         raise HTTPException(status_code=503, detail="Service unavailable")
 
 
-@app.post("/embed", response_model=EmbedResponse)
-async def generate_embedding(request: EmbedRequest):
+@app.post("/embed", response_model=EmbedResponse, response_class=ORJSONResponse)
+async def generate_embedding(request: EmbedRequest, http_request: Request):
     """
     Generate embedding for the provided text.
 
     The e5-base-v2 model produces 768-dimensional embeddings.
     Input text is automatically normalized and processed.
+    Clients sending "Accept: application/octet-stream" get the /embed_bin response.
 
     Args:
         request: EmbedRequest containing the text to embed
@@ -141,31 +462,39 @@ async def generate_embedding(request: EmbedRequest):
         if not request.text or len(request.text.strip()) == 0:
             raise HTTPException(status_code=400, detail="Text cannot be empty")
 
-        # Get the model
-        model = get_embedding_model()
+        embedding = await compute_embedding(request.prefixed_text())
 
-        # Generate embedding
-        start_time = time.time()
-        embedding = model.encode(
-            request.text,
-            normalize_embeddings=True,  # Same as Xenova version
-            show_progress_bar=False
-        )
-        inference_time = time.time() - start_time
+        if "application/octet-stream" in http_request.headers.get("accept", ""):
+            return embedding_binary_response(embedding)
+        return embedding_response(embedding)
 
-        # Convert to list of floats
-        embedding_list = embedding.tolist()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating embedding: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error generating embedding: {str(e)}")
 
-        logger.info(
-            f"Generated embedding for text (length: {len(request.text)}) "
-            f"in {inference_time:.3f}s"
-        )
 
-        return EmbedResponse(
-            embedding=embedding_list,
-            dimension=len(embedding_list),
-            model=MODEL_NAME
-        )
+@app.post("/embed_bin")
+async def generate_embedding_binary(request: EmbedRequest):
+    """
+    Generate embedding for the provided text as raw bytes.
+
+    The body is the 768-dimensional embedding as little-endian float16
+    (1.5 KB instead of ~11 KB of JSON floats).
+
+    Args:
+        request: EmbedRequest containing the text to embed
+
+    Returns:
+        application/octet-stream response with X-Emb-Dim and X-Emb-Dtype headers
+    """
+    try:
+        if not request.text or len(request.text.strip()) == 0:
+            raise HTTPException(status_code=400, detail="Text cannot be empty")
+
+        embedding = await compute_embedding(request.prefixed_text())
+        return embedding_binary_response(embedding)
 
     except HTTPException:
         raise
@@ -174,13 +503,63 @@ async def generate_embedding(request: EmbedRequest):
         raise HTTPException(status_code=500, detail=f"Error generating embedding: {str(e)}")
 
 
+@app.post("/embed_batch", response_class=ORJSONResponse)
+async def generate_embeddings_batch(request: EmbedBatchRequest):
+    """
+    Generate embeddings for a list of texts.
+
+    Each text goes through the same cache tiers as /embed; misses are queued
+    for the batch worker, so they share its forward passes (and the model is
+    only ever run from one thread).
+
+    Args:
+        request: EmbedBatchRequest containing the texts to embed
+
+    Returns:
+        JSON with one embedding per text, in request order
+    """
+    try:
+        if not request.texts or any(len(text.strip()) == 0 for text in request.texts):
+            raise HTTPException(status_code=400, detail="Texts cannot be empty")
+        if len(request.texts) > MAX_EMBED_BATCH_TEXTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_EMBED_BATCH_TEXTS} texts per request"
+            )
+
+        embeddings = await asyncio.gather(*(
+            compute_embedding(text) for text in request.prefixed_texts()
+        ))
+
+        return ORJSONResponse({
+            "embeddings": np.stack(embeddings),
+            "dimension": EMBEDDING_DIMENSION,
+            "model": MODEL_NAME
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating embeddings: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error generating embeddings: {str(e)}")
+
+
 # Startup event - preload model
 @app.on_event("startup")
 async def startup_event():
-    """Preload the model on startup to avoid cold starts"""
+    """Preload the model and start the batch worker on startup to avoid cold starts"""
+    global embedding_queue, batch_worker_task, redis_client
     logger.info("Starting T-Time Embedding Service...")
     try:
         get_embedding_model()
+        if ENABLE_REDIS_CACHE:
+            if REDIS_AVAILABLE:
+                redis_client = aioredis.Redis.from_url(REDIS_URL)
+                logger.info(f"Using Redis embedding cache at {REDIS_URL}")
+            else:
+                logger.warning("ENABLE_REDIS_CACHE is set but redis is not installed; install with: pip install redis")
+        embedding_queue = asyncio.Queue()
+        batch_worker_task = asyncio.create_task(batch_worker())
         logger.info("Service ready to accept requests")
     except Exception as e:
         logger.error(f"Failed to load model on startup: {str(e)}")
@@ -192,13 +571,21 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down T-Time Embedding Service...")
+    if batch_worker_task is not None:
+        batch_worker_task.cancel()
+    if redis_client is not None:
+        await redis_client.aclose()
 
 
 if __name__ == "__main__":
     import uvicorn
+    # Each worker is a separate process with its own copy of the model
     uvicorn.run(
-        app,
+        "app:app",
         host="0.0.0.0",
         port=8000,
+        workers=int(os.getenv("WORKERS", min(4, os.cpu_count() or 1))),
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
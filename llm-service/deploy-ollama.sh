@@ -7,6 +7,11 @@ echo "================================================"
 echo "STARTING OLLAMA NEMOTRON SERVER"
 echo "================================================"
 
+# Let Ollama batch concurrent requests into the same decode step instead of
+# queueing them one at a time (each parallel slot reserves its own KV cache)
+export OLLAMA_NUM_PARALLEL=${OLLAMA_NUM_PARALLEL:-4}
+export OLLAMA_MAX_QUEUE=${OLLAMA_MAX_QUEUE:-256}
+
 # Check if Ollama is already running
 if pgrep -x "ollama" > /dev/null; then
     echo "✓ Ollama already running"
@@ -28,7 +33,7 @@ echo "SERVER RUNNING"
 echo "================================================"
 echo ""
 echo "FastAPI: PID $API_PID (port 8001)"
-echo "Ollama: port 11434"
+echo "Ollama: port 11434 (parallel slots: $OLLAMA_NUM_PARALLEL)"
 echo ""
 echo "Test with:"
 echo "  curl -X POST http://localhost:8001/v1/chat/completions \\"
@@ -0,0 +1,11 @@
+"""
+Shared HTTP client for inter-service calls
+One long-lived AsyncClient so connections (and TLS sessions) are reused across requests
+"""
+import httpx
+
+CLIENT = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+    timeout=30.0
+)
@@ -3,10 +3,13 @@ Minimal Nemotron-70B server using Ollama
 ONE endpoint, no complexity
 """
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import requests
+import httpx
 import logging
 
+from http_client import CLIENT
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,12 +19,42 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_URL = f"{OLLAMA_BASE_URL}/api/generate"
+
+OLLAMA_MODEL = "nemotron-mini"
+
+# How long Ollama keeps the model (and its allocated KV cache) resident after a request
+OLLAMA_KEEP_ALIVE = "30m"
+
+# Generation can take much longer than the shared client's default timeout
+OLLAMA_TIMEOUT = httpx.Timeout(120.0)
 
 class ChatRequest(BaseModel):
     prompt: str
     max_tokens: int = 200
     temperature: float = 0.7
+    stream: bool = False
+
+def ollama_payload(request: ChatRequest, stream: bool) -> dict:
+    return {
+        "model": OLLAMA_MODEL,
+        "prompt": request.prompt,
+        "stream": stream,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": {
+            "temperature": request.temperature,
+            "num_predict": request.max_tokens
+        }
+    }
+
+async def stream_chat(request: ChatRequest):
+    """Forward Ollama's NDJSON chunks to the client as they are generated"""
+    async with CLIENT.stream("POST", OLLAMA_URL, json=ollama_payload(request, True), timeout=OLLAMA_TIMEOUT) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line:
+                yield line + "\n"
 
 @app.post("/v1/chat/completions")
 async def chat(request: ChatRequest):
@@ -30,19 +63,10 @@ async def chat(request: ChatRequest):
     try:
         logger.info(f"Calling Ollama at {OLLAMA_URL}")
 
-        response = requests.post(
-            OLLAMA_URL,
-            json={
-                "model": "nemotron-mini",
-                "prompt": request.prompt,
-                "stream": False,
-                "options": {
-                    "temperature": request.temperature,
-                    "num_predict": request.max_tokens
-                }
-            },
-            timeout=120
-        )
+        if request.stream:
+            return StreamingResponse(stream_chat(request), media_type="application/x-ndjson")
+
+        response = await CLIENT.post(OLLAMA_URL, json=ollama_payload(request, False), timeout=OLLAMA_TIMEOUT)
 
         logger.info(f"Ollama response status: {response.status_code}")
         response.raise_for_status()
@@ -50,16 +74,48 @@ async def chat(request: ChatRequest):
         result = response.json()
         logger.info(f"Generated response length: {len(result.get('response', ''))}")
 
-        return {"response": result["response"]}
+        # Ollama reports real token counts, so no re-tokenizing or word splitting is needed
+        prompt_tokens = result.get("prompt_eval_count", 0)
+        completion_tokens = result.get("eval_count", 0)
+
+        return {
+            "response": result["response"],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
 
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.on_event("startup")
+async def startup():
+    # A request without a prompt just loads the model, so the first chat skips the load
+    try:
+        await CLIENT.post(OLLAMA_URL, json={"model": OLLAMA_MODEL, "keep_alive": OLLAMA_KEEP_ALIVE}, timeout=OLLAMA_TIMEOUT)
+        logger.info(f"Preloaded {OLLAMA_MODEL} in Ollama")
+    except Exception as e:
+        logger.warning(f"Could not preload {OLLAMA_MODEL}: {str(e)}")
+
+@app.on_event("shutdown")
+async def shutdown():
+    await CLIENT.aclose()
+
 @app.get("/health")
 async def health():
     return {"status": "healthy", "model": "nemotron-70b"}
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    uvicorn.run(
+        "server-ollama:app",
+        host="0.0.0.0",
+        port=8001,
+        workers=min(4, os.cpu_count() or 1),
+        loop="uvloop",
+        http="httptools"
+    )
@@ -12,7 +12,27 @@ load_dotenv()
 # Pinecone Configuration
 PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
 PINECONE_INDEX_NAME = os.getenv('PINECONE_INDEX_NAME', 'ttime-sentiment')
+PINECONE_WEEKLY_NAMESPACES = os.getenv('PINECONE_WEEKLY_NAMESPACES', 'false').lower() == 'true'
+
+# Platforms searched concurrently (one query each) when search_sentiment runs with platform="all"
+SEARCH_PLATFORMS = ['reddit', 'consumer-affairs', 'pissedconsumer']
+SEARCH_FANOUT_BY_PLATFORM = os.getenv('SEARCH_FANOUT_BY_PLATFORM', 'true').lower() == 'true'
+
+# Analytics Result Cache (in-process by default, shared via Redis when enabled)
+ENABLE_REDIS_CACHE = os.getenv('ENABLE_REDIS_CACHE', 'false').lower() == 'true'
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', '300'))  # seconds
+TRENDING_CACHE_TTL = int(os.getenv('TRENDING_CACHE_TTL', '900'))  # seconds
+
+# Answer get_sentiment_summary from the scrapers' daily Redis rollups (REDIS_URL must point
+# at the scrapers' SENTIMENT_ROLLUP_REDIS_URL); windows older than the rollups fall back to a scan
+ENABLE_SENTIMENT_ROLLUPS = os.getenv('ENABLE_SENTIMENT_ROLLUPS', 'false').lower() == 'true'
 
 # MCP Server Configuration
 MCP_SERVER_PORT = int(os.getenv('MCP_SERVER_PORT', '8000'))
 MCP_SERVER_HOST = os.getenv('MCP_SERVER_HOST', '0.0.0.0')
+
+# Finished background tool calls whose results are never collected are dropped after
+# BACKGROUND_RESULT_TTL seconds, or oldest first once more than MAX_BACKGROUND_RESULTS are held
+BACKGROUND_RESULT_TTL = int(os.getenv('BACKGROUND_RESULT_TTL', '600'))  # seconds
+MAX_BACKGROUND_RESULTS = int(os.getenv('MAX_BACKGROUND_RESULTS', '100'))
@@ -17,6 +17,13 @@ load_dotenv(env_path)
 # Pinecone Configuration
 PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
 PINECONE_INDEX_NAME = os.getenv('PINECONE_INDEX_NAME', 'ttime-sentiment')
+PINECONE_WEEKLY_NAMESPACES = os.getenv('PINECONE_WEEKLY_NAMESPACES', 'false').lower() == 'true'
+UPSERT_BATCH_SIZE = int(os.getenv('UPSERT_BATCH_SIZE', '100'))  # vectors per upsert request
+UPSERT_POOL_THREADS = int(os.getenv('UPSERT_POOL_THREADS', '30'))  # concurrent upsert requests
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))  # texts per embedding forward pass
+
+# Model Configuration
+QUANTIZE_SENTIMENT = os.getenv('QUANTIZE_SENTIMENT', 'false').lower() == 'true'  # int8 sentiment model on CPU
 
 # Source Platform Metadata
 SOURCE_PLATFORM = 'pissedconsumer'
@@ -29,7 +36,8 @@ REVIEWS_URL = f'{BASE_URL}/review.html'
 
 # Scraping Configuration
 MAX_PAGES = 50  # Number of review pages to scrape (usually 20-30 reviews per page)
-RATE_LIMIT_DELAY = 2.0  # Seconds between requests
+RATE_LIMIT_DELAY = 2.0  # Seconds between request windows
+PAGE_FETCH_CONCURRENCY = 4  # Review pages fetched concurrently per window
 
 # User Agent
 USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
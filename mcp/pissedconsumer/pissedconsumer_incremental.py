@@ -7,16 +7,58 @@ performs sentiment analysis, generates embeddings, and uploads to Pinecone.
 Designed to be called periodically or via API.
 """
 
-import requests
+import asyncio
+import functools
+import threading
+import httpx
+import numpy as np
 from bs4 import BeautifulSoup
 import time
 import re
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import config
 import utils
 
 
+# Precompiled patterns and templates used for every review
+_HELPFUL_RE = re.compile(r'Helpful|Useful', re.I)
+_DIGITS_RE = re.compile(r'(\d+)')
+_REVIEW_URL_TMPL = "https://www.pissedconsumer.com/tmobile/review-{}.html"
+_CANADIAN_PROVINCES = frozenset({'Quebec', 'Ontario', 'BC', 'Alberta', 'Manitoba', 'Saskatchewan'})
+
+# Fallback formats for dates that are not ISO 8601, tried after the fast paths
+_NUMERIC_DATE_FORMATS = ('%m/%d/%Y',)
+_MONTH_NAME_DATE_FORMATS = ('%B %d, %Y', '%b %d, %Y')
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date(date_str: str) -> Optional[float]:
+    """
+    Parse a review date string to a timestamp, or None if no format matches.
+
+    Numeric dates try the C-level ISO parser first; month-name dates only try
+    month-name formats. Results are cached since many reviews share a date.
+    """
+    if not date_str:
+        return None
+
+    if date_str[0].isdigit():
+        try:
+            return datetime.fromisoformat(date_str).timestamp()
+        except ValueError:
+            formats = _NUMERIC_DATE_FORMATS
+    else:
+        formats = _MONTH_NAME_DATE_FORMATS
+
+    for fmt in formats:
+        try:
+            return datetime.strptime(date_str, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
 def create_pissedconsumer_metadata(item: Dict[str, Any]) -> Dict[str, Any]:
     """
     Create standardized metadata for a PissedConsumer review.
@@ -27,64 +69,106 @@ def create_pissedconsumer_metadata(item: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         A metadata dictionary ready for Pinecone.
     """
-    metadata = {
-        'source_platform': config.SOURCE_PLATFORM,
-        'source_type': config.SOURCE_TYPE,
-        'source_identifier': item['id'],
-        'post_type': 'review',
-        'upvotes': item.get('helpful_count', 0),
-        'timestamp': item['timestamp'],
-        'datetime': datetime.fromtimestamp(item['timestamp']).isoformat(),
-        'sentiment_score': item['sentiment']['sentiment_value'],
-        'sentiment_label': item['sentiment']['label'],
-        'author': item['author'],
-        'url': item['url'],
-        'rating': item.get('rating', 1.0),
-        'business_name': config.BUSINESS_NAME,
-        'review_source': 'PissedConsumer'
-    }
-
-    # Use structured location from author profile if available
-    author_location = item.get('author_location')
-    if author_location:
-        # Parse the structured location (e.g., "Los Angeles, CA")
-        parts = [p.strip() for p in author_location.split(',')]
-        if len(parts) == 2:
-            metadata['location_city'] = parts[0]
-            metadata['location_state'] = parts[1]
-            metadata['location_raw'] = author_location
-
-            # Determine country based on state/province
-            state_lower = parts[1].lower()
-            if state_lower in utils.US_STATES or state_lower in utils.US_STATE_ABBR:
-                metadata['location_country'] = 'USA'
-            elif parts[1] in ['Quebec', 'Ontario', 'BC', 'Alberta', 'Manitoba', 'Saskatchewan']:
-                metadata['location_country'] = 'Canada'
-
-        elif len(parts) == 1:
-            # Just state/province
-            metadata['location_state'] = parts[0]
-            metadata['location_raw'] = author_location
-
-    # Fallback: Extract location from review text using NER if no structured location
-    elif not author_location:
-        location = utils.extract_location(item['text'])
-        if location['location_state']:  # Only add if state detected
-            if location['location_city']:
-                metadata['location_city'] = location['location_city']
-            if location['location_state']:
-                metadata['location_state'] = location['location_state']
-            if location['location_country']:
-                metadata['location_country'] = location['location_country']
-            if location['location_raw']:
-                metadata['location_raw'] = location['location_raw']
-            if location['location_confidence'] is not None:
-                metadata['location_confidence'] = location['location_confidence']
-
-    return metadata
+    return create_pissedconsumer_metadata_batch([item])[0]
+
+
+def create_pissedconsumer_metadata_batch(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Create standardized metadata for many PissedConsumer reviews at once.
+
+    Datetime strings for all reviews are formatted in one vectorized pass.
+
+    Args:
+        items: Dictionaries containing scraped review data.
+
+    Returns:
+        Metadata dictionaries ready for Pinecone, in input order.
+    """
+    datetimes = utils.iso_datetimes([item['timestamp'] for item in items])
+
+    metadatas = [
+        {
+            'source_platform': config.SOURCE_PLATFORM,
+            'source_type': config.SOURCE_TYPE,
+            'source_identifier': item['id'],
+            'post_type': 'review',
+            'upvotes': item.get('helpful_count', 0),
+            'timestamp': item['timestamp'],
+            'datetime': datetime_str,
+            'sentiment_score': item['sentiment']['sentiment_value'],
+            'sentiment_label': item['sentiment']['label'],
+            'author': item['author'],
+            'url': item['url'],
+            'rating': item.get('rating', 1.0),
+            'business_name': config.BUSINESS_NAME,
+            'review_source': 'PissedConsumer'
+        }
+        for item, datetime_str in zip(items, datetimes)
+    ]
+
+    for item, metadata in zip(items, metadatas):
+        # Use structured location from author profile if available
+        author_location = item.get('author_location')
+        if author_location:
+            # Parse the structured location (e.g., "Los Angeles, CA")
+            parts = [p.strip() for p in author_location.split(',')]
+            if len(parts) == 2:
+                metadata['location_city'] = parts[0]
+                metadata['location_state'] = parts[1]
+                metadata['location_raw'] = author_location
+
+                # Determine country based on state/province
+                state_lower = parts[1].lower()
+                if state_lower in utils.US_STATE_NAMES_AND_ABBR:
+                    metadata['location_country'] = 'USA'
+                elif parts[1] in _CANADIAN_PROVINCES:
+                    metadata['location_country'] = 'Canada'
+
+            elif len(parts) == 1:
+                # Just state/province
+                metadata['location_state'] = parts[0]
+                metadata['location_raw'] = author_location
+
+        # Fallback: Extract location from review text using NER if no structured location
+        elif not author_location:
+            location = item.get('location')
+            if location is None:
+                location = utils.extract_location(item['text'])
+            if location['location_state']:  # Only add if state detected
+                if location['location_city']:
+                    metadata['location_city'] = location['location_city']
+                if location['location_state']:
+                    metadata['location_state'] = location['location_state']
+                if location['location_country']:
+                    metadata['location_country'] = location['location_country']
+                if location['location_raw']:
+                    metadata['location_raw'] = location['location_raw']
+                if location['location_confidence'] is not None:
+                    metadata['location_confidence'] = location['location_confidence']
+
+    return metadatas
+
+
+def add_pissedconsumer_locations(items: List[Dict[str, Any]]):
+    """
+    Extract locations from review text in one batched NER pass, for reviews
+    without a structured author location.
+
+    Args:
+        items: Scraped review data items; those needing NER get a 'location' key
+    """
+    needs_ner = [item for item in items if not item.get('author_location')]
+    locations = utils.extract_locations_batch([item['text'] for item in needs_ner])
+    for item, location in zip(needs_ner, locations):
+        item['location'] = location
 
 
 class PissedConsumerIncrementalScraper:
+    __slots__ = (
+        'logger', 'headers', 'state_file', 'state', 'seen',
+        'collected_data', 'skipped_count', 'error_count', 'counts_lock'
+    )
+
     def __init__(self, state_file: str = "last_scrape_state.json"):
         """
         Initialize the PissedConsumer incremental scraper.
@@ -97,17 +181,16 @@ class PissedConsumerIncrementalScraper:
         self.logger.info("Initializing PissedConsumer Incremental Scraper...")
 
         # Initialize ML models
-        utils.init_sentiment_analyzer()
+        utils.init_sentiment_analyzer(quantize=config.QUANTIZE_SENTIMENT)
         utils.init_embedding_model()
         utils.init_pinecone(config.PINECONE_API_KEY)
 
-        # Session for requests
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Headers for page requests
+        self.headers = {
             'User-Agent': config.USER_AGENT,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
-        })
+        }
 
         self.state_file = state_file
         self.state = utils.load_state(self.state_file)
@@ -116,29 +199,213 @@ class PissedConsumerIncrementalScraper:
         else:
             self.logger.info("No previous state file found, starting fresh")
 
+        # IDs already uploaded in earlier runs
+        self.seen = utils.load_seen_ids(self.state_file)
+
         self.collected_data = []
         self.skipped_count = 0
         self.error_count = 0
+        self.counts_lock = threading.Lock()
+
+    def count(self, skipped: int = 0, errors: int = 0):
+        """Add to the skipped/error counters (safe to call from worker threads)."""
+        with self.counts_lock:
+            self.skipped_count += skipped
+            self.error_count += errors
 
     def parse_review_date(self, date_str: str) -> float:
         """Parse date string to timestamp."""
         try:
-            for fmt in ['%Y-%m-%d %H:%M:%S', '%B %d, %Y', '%b %d, %Y', '%m/%d/%Y', '%Y-%m-%d']:
-                try:
-                    dt = datetime.strptime(date_str.strip(), fmt)
-                    return dt.timestamp()
-                except ValueError:
-                    continue
-            self.logger.warning(f"Could not parse date '{date_str}'")
-            return time.time()
+            timestamp = _parse_date(date_str.strip())
+            if timestamp is None:
+                self.logger.warning(f"Could not parse date '{date_str}'")
+                return time.time()
+            return timestamp
         except Exception as e:
             self.logger.warning(f"Error parsing date '{date_str}': {e}")
             return time.time()
 
-    def scrape_new_reviews(self, last_timestamp: Optional[float] = None) -> List[Dict[str, Any]]:
+    def container_timestamp(self, container) -> float:
+        """Get the timestamp of a review container (now if it has no date)."""
+        try:
+            date_elem = container.select_one('time')
+        except Exception as e:
+            self.logger.warning(f"Error reading review date: {e}")
+            return time.time()
+        if date_elem is None:
+            return time.time()
+        return self.parse_review_date(date_elem.get('datetime') or date_elem.get_text(strip=True))
+
+    def parse_review_page(self, content: bytes, page_num: int, last_timestamp: Optional[float]) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+        """
+        Parse one page of reviews and analyze their sentiment.
+
+        Args:
+            content: Raw HTML of the page
+            page_num: Page number (for logging)
+            last_timestamp: Unix timestamp of last scrape (None for first run)
+
+        Returns:
+            Tuple of (new review data items, number of reviews newer than
+            last_timestamp), or None if the page has no reviews
+        """
+        soup = BeautifulSoup(content, 'lxml')
+
+        # Find review containers
+        review_containers = soup.select('div.f-component-item[id^="review-"]')
+
+        if not review_containers:
+            return None
+
+        # Parse every review date first, then keep only reviews newer than last_timestamp
+        timestamps = np.fromiter(
+            (self.container_timestamp(container) for container in review_containers),
+            dtype=np.float64,
+            count=len(review_containers)
+        )
+        new_indices = np.nonzero(timestamps > (last_timestamp or 0))[0]
+        new_reviews_on_page = len(new_indices)
+
+        # Bind hot attributes locally; counters are flushed to self after the loop
+        page_items = []
+        append_item = page_items.append
+        seen = self.seen
+        log_warning = self.logger.warning
+        skipped = 0
+        errors = 0
+
+        for i in new_indices:
+            container = review_containers[i]
+            timestamp = float(timestamps[i])
+            try:
+                # Skip reviews uploaded by an earlier run
+                data_id = container.get('data-id')
+                if data_id and data_id in seen:
+                    skipped += 1
+                    continue
+
+                # Extract title
+                title = container.get('aria-label', '').strip()
+                if not title:
+                    continue
+
+                # Extract text
+                text_elem = container.select_one('div.f-component-text')
+                review_text = text_elem.get_text(strip=True) if text_elem else ""
+                full_text = f"{title}. {review_text}" if review_text else title
+
+                if len(full_text) < 20:
+                    skipped += 1
+                    continue
+
+                # Extract author
+                author_name_elem = container.select_one('span[itemprop="author"] span[itemprop="name"]')
+                author = author_name_elem.get_text(strip=True) if author_name_elem else 'Anonymous'
+
+                # Extract location from location-line class
+                author_location = None
+                location_elem = container.select_one('.location-line')
+                if location_elem:
+                    author_location = location_elem.get_text(strip=True)
+
+                # Extract rating
+                rating = 1.0
+                rating_elem = container.select_one('meta[itemprop="ratingValue"]')
+                if rating_elem:
+                    rating = float(rating_elem.get('content', 1.0))
+
+                # Extract helpful count
+                helpful_elem = container.find('button', string=_HELPFUL_RE)
+                helpful_count = 0
+                if helpful_elem:
+                    helpful_text = helpful_elem.get_text()
+                    match = _DIGITS_RE.search(helpful_text)
+                    if match:
+                        helpful_count = int(match.group(1))
+
+                # Build URL
+                review_url = _REVIEW_URL_TMPL.format(data_id) if data_id else config.REVIEWS_URL
+
+                # Create review data (sentiment is added in one batch per page)
+                review_data = {
+                    'id': data_id or f"pc_{int(timestamp)}",
+                    'text': full_text,
+                    'rating': rating,
+                    'author': author,
+                    'author_location': author_location,  # Store structured location
+                    'timestamp': timestamp,
+                    'helpful_count': helpful_count,
+                    'url': review_url
+                }
+
+                append_item(review_data)
+
+            except Exception as e:
+                log_warning(f"Error processing review: {e}")
+                errors += 1
+                continue
+
+        self.count(skipped=skipped, errors=errors)
+
+        # Analyze sentiment of all reviews on the page in one batch
+        sentiments = utils.analyze_sentiment_batch([item['text'] for item in page_items])
+        for item, sentiment in zip(page_items, sentiments):
+            item['sentiment'] = sentiment
+
+        self.logger.info(f"Found {new_reviews_on_page} new reviews on page {page_num}")
+        return page_items, new_reviews_on_page
+
+    async def fetch_page(
+        self,
+        client: httpx.AsyncClient,
+        page_num: int,
+        conditional: bool = False
+    ) -> Tuple[str, Optional[bytes], Dict[str, str]]:
+        """
+        Fetch the raw HTML of one review page.
+
+        Args:
+            client: HTTP client
+            page_num: Page number (1-based)
+            conditional: Send the ETag/Last-Modified saved from the previous run
+
+        Returns:
+            Tuple of (url, content, validators); content is None if the server
+            answered 304 Not Modified
+        """
+        url = config.REVIEWS_URL if page_num == 1 else f"{config.REVIEWS_URL}?page={page_num}"
+
+        headers = {}
+        if conditional:
+            validators = self.state.get('page_validators', {}).get(url, {})
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        response = await client.get(url, headers=headers)
+        if response.status_code == 304:
+            return url, None, {}
+        response.raise_for_status()
+
+        validators = {
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified')
+        }
+        return url, response.content, validators
+
+    async def scrape_new_reviews_async(self, last_timestamp: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Scrape new reviews since last timestamp.
 
+        Pages are fetched concurrently in windows of config.PAGE_FETCH_CONCURRENCY
+        over one HTTP/2 connection, then parsed in order so pagination still stops
+        at the first page without new reviews.
+
+        On incremental runs pages are requested conditionally (ETag /
+        Last-Modified from the previous run), and a 304 stops pagination
+        without downloading or parsing the page.
+
         Args:
             last_timestamp: Unix timestamp of last scrape (None for first run)
 
@@ -158,127 +425,69 @@ class PissedConsumerIncrementalScraper:
         collected_items = []
         max_pages = 3 if last_timestamp is None else 10  # Check more pages for incremental
 
-        for page_num in range(1, max_pages + 1):
-            # Construct page URL
-            if page_num == 1:
-                url = config.REVIEWS_URL
-            else:
-                url = f"{config.REVIEWS_URL}?page={page_num}"
-
-            try:
-                self.logger.info(f"Checking page {page_num}...")
-                response = self.session.get(url, timeout=15)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                # Find review containers
-                review_containers = soup.find_all('div', class_='f-component-item', id=lambda x: x and x.startswith('review-'))
-
-                if not review_containers:
-                    self.logger.info(f"No reviews found on page {page_num}, stopping.")
-                    break
-
-                new_reviews_on_page = 0
-                for container in review_containers:
+        async with httpx.AsyncClient(
+            http2=True,
+            headers=self.headers,
+            timeout=httpx.Timeout(15.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=config.PAGE_FETCH_CONCURRENCY * 2,
+                max_connections=config.PAGE_FETCH_CONCURRENCY * 4
+            ),
+            follow_redirects=True
+        ) as client:
+            for window_start in range(1, max_pages + 1, config.PAGE_FETCH_CONCURRENCY):
+                page_nums = list(range(window_start, min(window_start + config.PAGE_FETCH_CONCURRENCY, max_pages + 1)))
+                self.logger.info(f"Checking pages {page_nums[0]}-{page_nums[-1]}...")
+                pages = await asyncio.gather(
+                    *(
+                        self.fetch_page(client, page_num, conditional=last_timestamp is not None)
+                        for page_num in page_nums
+                    ),
+                    return_exceptions=True
+                )
+
+                stop = False
+                for page_num, page in zip(page_nums, pages):
                     try:
-                        # Extract date first to check if we should continue
-                        date_elem = container.find('time')
-                        if date_elem:
-                            date_str = date_elem.get('datetime') or date_elem.get_text(strip=True)
-                            timestamp = self.parse_review_date(date_str)
-                        else:
-                            timestamp = time.time()
-
-                        # If we have a last timestamp, skip older reviews
-                        if last_timestamp and timestamp <= last_timestamp:
-                            continue
-
-                        new_reviews_on_page += 1
-
-                        # Extract title
-                        title = container.get('aria-label', '').strip()
-                        if not title:
-                            continue
-
-                        # Extract text
-                        text_elem = container.find('div', class_='f-component-text')
-                        review_text = text_elem.get_text(strip=True) if text_elem else ""
-                        full_text = f"{title}. {review_text}" if review_text else title
-
-                        if len(full_text) < 20:
-                            self.skipped_count += 1
-                            continue
-
-                        # Extract author
-                        author_elem = container.find('span', {'itemprop': 'author'})
-                        if author_elem:
-                            author_name_elem = author_elem.find('span', {'itemprop': 'name'})
-                            author = author_name_elem.get_text(strip=True) if author_name_elem else 'Anonymous'
-                        else:
-                            author = 'Anonymous'
-
-                        # Extract location from location-line class
-                        author_location = None
-                        location_elem = container.find(class_='location-line')
-                        if location_elem:
-                            author_location = location_elem.get_text(strip=True)
-
-                        # Extract rating
-                        rating = 1.0
-                        rating_elem = container.find('meta', {'itemprop': 'ratingValue'})
-                        if rating_elem:
-                            rating = float(rating_elem.get('content', 1.0))
-
-                        # Extract helpful count
-                        helpful_elem = container.find('button', string=re.compile(r'Helpful|Useful', re.I))
-                        helpful_count = 0
-                        if helpful_elem:
-                            helpful_text = helpful_elem.get_text()
-                            match = re.search(r'(\d+)', helpful_text)
-                            if match:
-                                helpful_count = int(match.group(1))
-
-                        # Build URL
-                        data_id = container.get('data-id')
-                        review_url = f"https://www.pissedconsumer.com/tmobile/review-{data_id}.html" if data_id else config.REVIEWS_URL
-
-                        # Analyze sentiment
-                        sentiment = utils.analyze_sentiment(full_text)
-
-                        # Create review data
-                        review_data = {
-                            'id': data_id or f"pc_{int(timestamp)}",
-                            'text': full_text,
-                            'rating': rating,
-                            'author': author,
-                            'author_location': author_location,  # Store structured location
-                            'timestamp': timestamp,
-                            'helpful_count': helpful_count,
-                            'url': review_url,
-                            'sentiment': sentiment
-                        }
-
-                        collected_items.append(review_data)
+                        if isinstance(page, Exception):
+                            raise page
+
+                        url, content, validators = page
+                        if content is None:
+                            self.logger.info(f"Page {page_num} not modified since last scrape, stopping.")
+                            stop = True
+                            break
+
+                        parsed = self.parse_review_page(content, page_num, last_timestamp)
+                        if parsed is None:
+                            self.logger.info(f"No reviews found on page {page_num}, stopping.")
+                            stop = True
+                            break
+
+                        page_items, new_reviews_on_page = parsed
+                        collected_items.extend(page_items)
+
+                        # Remember validators only for pages that parsed cleanly
+                        if validators['etag'] or validators['last_modified']:
+                            self.state.setdefault('page_validators', {})[url] = validators
+
+                        # If no new reviews on this page, we've reached old content
+                        if new_reviews_on_page == 0:
+                            self.logger.info("No new reviews found, stopping pagination.")
+                            stop = True
+                            break
 
                     except Exception as e:
-                        self.logger.warning(f"Error processing review: {e}")
-                        self.error_count += 1
-                        continue
-
-                self.logger.info(f"Found {new_reviews_on_page} new reviews on page {page_num}")
+                        self.logger.error(f"Error scraping page {page_num}: {e}")
+                        self.count(errors=1)
+                        stop = True
+                        break
 
-                # If no new reviews on this page, we've reached old content
-                if new_reviews_on_page == 0:
-                    self.logger.info("No new reviews found, stopping pagination.")
+                if stop:
                     break
 
-                # Rate limiting
-                time.sleep(config.RATE_LIMIT_DELAY)
-
-            except Exception as e:
-                self.logger.error(f"Error scraping page {page_num}: {e}")
-                self.error_count += 1
-                break
+                # Rate limiting between windows
+                await asyncio.sleep(config.RATE_LIMIT_DELAY)
 
         self.logger.info("=" * 80)
         self.logger.info(f"Collected {len(collected_items)} new reviews")
@@ -287,6 +496,10 @@ class PissedConsumerIncrementalScraper:
 
         return collected_items
 
+    def scrape_new_reviews(self, last_timestamp: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Synchronous wrapper around scrape_new_reviews_async."""
+        return asyncio.run(self.scrape_new_reviews_async(last_timestamp))
+
     def run(self) -> Dict[str, Any]:
         """
         Run the incremental scraper.
@@ -320,16 +533,31 @@ class PissedConsumerIncrementalScraper:
         # Process and upload
         if all_data:
             # Upload to Pinecone
+            stored_ids = set()
             uploaded_count = utils.process_and_upload_to_pinecone(
                 data_items=all_data,
                 source_platform='pissedconsumer',
                 index_name=config.PINECONE_INDEX_NAME,
                 api_key=config.PINECONE_API_KEY,
                 metadata_creator_func=create_pissedconsumer_metadata,
-                logger=self.logger
+                metadata_batch_creator_func=create_pissedconsumer_metadata_batch,
+                logger=self.logger,
+                namespace_by_week=config.PINECONE_WEEKLY_NAMESPACES,
+                upsert_batch_size=config.UPSERT_BATCH_SIZE,
+                upsert_pool_threads=config.UPSERT_POOL_THREADS,
+                embedding_batch_size=config.EMBEDDING_BATCH_SIZE,
+                stored_ids=stored_ids,
+                preprocess_func=add_pissedconsumer_locations
             )
             stats['total_items_uploaded'] = uploaded_count
 
+            # Remember stored IDs so later runs skip them before any inference.
+            # Items that failed to upload stay unseen, but last_scrape_timestamp
+            # still advances past them, so they are not re-scraped
+            for item_id in stored_ids:
+                self.seen.add(item_id)
+            utils.save_seen_ids(self.state_file, self.seen)
+
             # Update state with current timestamp
             self.state['last_scrape_timestamp'] = current_timestamp
             if utils.save_state(self.state_file, self.state):
@@ -339,6 +567,9 @@ class PissedConsumerIncrementalScraper:
         else:
             self.logger.info("\nNo new data collected")
 
+            # Keep page validators fresh even when nothing new was collected
+            utils.save_state(self.state_file, self.state)
+
         elapsed_time = time.time() - start_time
         stats['execution_time'] = elapsed_time
 
@@ -22,14 +22,24 @@ REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT', 'TTime-Scraper/1.0')
 # Pinecone Configuration
 PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
 PINECONE_INDEX_NAME = os.getenv('PINECONE_INDEX_NAME', 'ttime-sentiment')
+PINECONE_WEEKLY_NAMESPACES = os.getenv('PINECONE_WEEKLY_NAMESPACES', 'false').lower() == 'true'
+UPSERT_BATCH_SIZE = int(os.getenv('UPSERT_BATCH_SIZE', '100'))  # vectors per upsert request
+UPSERT_POOL_THREADS = int(os.getenv('UPSERT_POOL_THREADS', '30'))  # concurrent upsert requests
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))  # texts per embedding forward pass
+
+# Model Configuration
+QUANTIZE_SENTIMENT = os.getenv('QUANTIZE_SENTIMENT', 'false').lower() == 'true'  # int8 sentiment model on CPU
 
 # Scraping Configuration
 TARGET_SUBREDDITS = os.getenv('TARGET_SUBREDDITS', 'tmobile').split(',')
 LOOKBACK_DAYS = int(os.getenv('LOOKBACK_DAYS', '180'))
+COMMENT_LIMIT = int(os.getenv('COMMENT_LIMIT', '500'))  # newest comments fetched per submission
 
 # Metadata constants
 SOURCE_PLATFORM = 'reddit'
 SOURCE_TYPE = 'social_media'
 
 # Processing Configuration
-RATE_LIMIT_DELAY = 2  # seconds between API calls
+RATE_LIMIT_DELAY = 1  # seconds between submissions (PRAW also enforces Reddit's own limits)
+SENTIMENT_BATCH_SIZE = 32  # items per sentiment batch while scraping
+COMMENT_FETCH_WORKERS = int(os.getenv('COMMENT_FETCH_WORKERS', '4'))  # submissions whose comments are fetched concurrently
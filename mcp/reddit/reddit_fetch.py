@@ -10,6 +10,9 @@ Designed to be called periodically or via API.
 import praw
 import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from threading import Lock, Thread
 from typing import List, Dict, Any, Optional
 from tqdm import tqdm
 import config as config
@@ -26,44 +29,84 @@ def create_reddit_metadata(item: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         A metadata dictionary ready for Pinecone.
     """
-    metadata = {
-        'source_platform': config.SOURCE_PLATFORM,
-        'source_type': config.SOURCE_TYPE,
-        'source_identifier': item['id'],
-        'post_type': item['type'],
-        'upvotes': item['upvotes'],
-        'timestamp': item['timestamp'],
-        'datetime': datetime.fromtimestamp(item['timestamp']).isoformat(),
-        'sentiment_score': item['sentiment']['sentiment_value'],
-        'sentiment_label': item['sentiment']['label'],
-        'author': item['author'],
-        'subreddit': item['subreddit'],
-        'url': item.get('url') or f"https://reddit.com/comments/{item['id']}"
-    }
-
-    if item.get('title'):
-        metadata['title'] = item['title']
-
-    if item.get('parent_id'):
-        metadata['parent_id'] = item['parent_id']
-
-    # Extract location from text (only adds if state is detected)
-    location = utils.extract_location(item['text'])
-    if location['location_city']:
-        metadata['location_city'] = location['location_city']
-    if location['location_state']:
-        metadata['location_state'] = location['location_state']
-    if location['location_country']:
-        metadata['location_country'] = location['location_country']
-    if location['location_raw']:
-        metadata['location_raw'] = location['location_raw']
-    if location['location_confidence'] is not None:
-        metadata['location_confidence'] = location['location_confidence']
-
-    return metadata
+    return create_reddit_metadata_batch([item])[0]
+
+
+def create_reddit_metadata_batch(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Create standardized metadata for many Reddit data items at once.
+
+    Datetime strings for all items are formatted in one vectorized pass.
+
+    Args:
+        items: Dictionaries containing scraped Reddit data.
+
+    Returns:
+        Metadata dictionaries ready for Pinecone, in input order.
+    """
+    datetimes = utils.iso_datetimes([item['timestamp'] for item in items])
+
+    metadatas = [
+        {
+            'source_platform': config.SOURCE_PLATFORM,
+            'source_type': config.SOURCE_TYPE,
+            'source_identifier': item['id'],
+            'post_type': item['type'],
+            'upvotes': item['upvotes'],
+            'timestamp': item['timestamp'],
+            'datetime': datetime_str,
+            'sentiment_score': item['sentiment']['sentiment_value'],
+            'sentiment_label': item['sentiment']['label'],
+            'author': item['author'],
+            'subreddit': item['subreddit'],
+            'url': item.get('url') or f"https://reddit.com/comments/{item['id']}"
+        }
+        for item, datetime_str in zip(items, datetimes)
+    ]
+
+    for item, metadata in zip(items, metadatas):
+        if item.get('title'):
+            metadata['title'] = item['title']
+
+        if item.get('parent_id'):
+            metadata['parent_id'] = item['parent_id']
+
+        # Extract location from text (only adds if state is detected)
+        location = item.get('location')
+        if location is None:
+            location = utils.extract_location(item['text'])
+        if location['location_city']:
+            metadata['location_city'] = location['location_city']
+        if location['location_state']:
+            metadata['location_state'] = location['location_state']
+        if location['location_country']:
+            metadata['location_country'] = location['location_country']
+        if location['location_raw']:
+            metadata['location_raw'] = location['location_raw']
+        if location['location_confidence'] is not None:
+            metadata['location_confidence'] = location['location_confidence']
+
+    return metadatas
+
+
+def add_reddit_locations(items: List[Dict[str, Any]]):
+    """
+    Extract locations for Reddit items in one batched NER pass.
+
+    Args:
+        items: Scraped Reddit data items; each gets a 'location' key
+    """
+    locations = utils.extract_locations_batch([item['text'] for item in items])
+    for item, location in zip(items, locations):
+        item['location'] = location
 
 
 class RedditIncrementalScraper:
+    __slots__ = (
+        'logger', 'reddit', 'reddit_clients', 'state_file', 'state', 'seen',
+        'collected_data', 'skipped_count', 'error_count', 'counts_lock'
+    )
+
     def __init__(self, state_file: str = "last_scrape_state.json"):
         """
         Initialize the Reddit incremental scraper.
@@ -75,17 +118,17 @@ class RedditIncrementalScraper:
         self.logger = utils.setup_logger("reddit_incremental_scraper")
         self.logger.info("Initializing Reddit Incremental Scraper...")
 
-        # Initialize Reddit client
-        self.reddit = praw.Reddit(
-            client_id=config.REDDIT_CLIENT_ID,
-            client_secret=config.REDDIT_CLIENT_SECRET,
-            user_agent=config.REDDIT_USER_AGENT
-        )
+        # Initialize Reddit clients: PRAW is not thread-safe, so the listing thread
+        # and each comment fetch worker use their own client
+        self.reddit = self.new_reddit()
+        self.reddit_clients = Queue()
+        for _ in range(config.COMMENT_FETCH_WORKERS):
+            self.reddit_clients.put(self.new_reddit())
 
         self.logger.info(f"Connected to Reddit (read-only: {self.reddit.read_only})")
 
         # Initialize models
-        utils.init_sentiment_analyzer()
+        utils.init_sentiment_analyzer(quantize=config.QUANTIZE_SENTIMENT)
         utils.init_embedding_model()
         utils.init_pinecone(config.PINECONE_API_KEY)
 
@@ -96,35 +139,57 @@ class RedditIncrementalScraper:
         else:
             self.logger.info("No previous state file found, starting fresh")
 
+        # IDs already uploaded in earlier runs
+        self.seen = utils.load_seen_ids(self.state_file)
+
         self.collected_data = []
         self.skipped_count = 0
         self.error_count = 0
+        self.counts_lock = Lock()
 
-    def scrape_submission(self, submission) -> List[Dict[str, Any]]:
+    @staticmethod
+    def new_reddit() -> praw.Reddit:
+        """Create a read-only Reddit client."""
+        return praw.Reddit(
+            client_id=config.REDDIT_CLIENT_ID,
+            client_secret=config.REDDIT_CLIENT_SECRET,
+            user_agent=config.REDDIT_USER_AGENT
+        )
+
+    def count(self, skipped: int = 0, errors: int = 0):
+        """Add to the skipped/error counters (safe to call from worker threads)."""
+        with self.counts_lock:
+            self.skipped_count += skipped
+            self.error_count += errors
+
+    def extract_submission(self, submission) -> List[Dict[str, Any]]:
         """
-        Scrape a single submission and its comments.
+        Fetch a single submission and its comments, without sentiment.
 
         Args:
-            submission: PRAW submission object
+            submission: PRAW submission object (may be lazy; it is fetched
+                together with its comments on first attribute access)
 
         Returns:
-            List of data dictionaries (post + comments)
+            List of data dictionaries (post first, then comments)
         """
         data_items = []
 
         try:
+            # Fetch up to COMMENT_LIMIT newest comments in the same request as the post
+            # (set before any attribute access triggers the fetch)
+            submission.comment_sort = 'new'
+            submission.comment_limit = config.COMMENT_LIMIT
+
             # Scrape the main post
             post_text = f"{submission.title}\n\n{submission.selftext}" if submission.selftext else submission.title
 
             # Skip if post is too short or deleted
             if len(post_text.strip()) < 10 or submission.author is None:
-                self.skipped_count += 1
+                self.count(skipped=1)
                 return data_items
 
-            # Analyze sentiment
-            sentiment = utils.analyze_sentiment(post_text)
-
-            # Create post data
+            # Create post data (sentiment is added by the consumer in batches)
             post_data = {
                 'id': submission.id,
                 'type': 'post',
@@ -135,25 +200,30 @@ class RedditIncrementalScraper:
                 'author': str(submission.author),
                 'subreddit': str(submission.subreddit),
                 'url': f"https://reddit.com{submission.permalink}",
-                'num_comments': submission.num_comments,
-                'sentiment': sentiment
+                'num_comments': submission.num_comments
             }
 
             data_items.append(post_data)
 
-            # Scrape comments
-            submission.comments.replace_more(limit=0)
-
-            comments_data = []
-            for comment in submission.comments.list():
+            # Drop "load more" stubs instead of resolving them one round trip at a time
+            submission.comments.replace_more(limit=0, threshold=0)
+
+            # Skip deleted/removed comments or very short ones, and count
+            # comments uploaded by an earlier run as skipped
+            seen = self.seen
+            comments = [
+                comment for comment in submission.comments.list()
+                if comment.author is not None and len(comment.body.strip()) >= 10
+            ]
+            new_comments = [comment for comment in comments if comment.id not in seen]
+            self.count(skipped=len(comments) - len(new_comments))
+            comments = new_comments
+
+            append_item = data_items.append
+            submission_id = submission.id
+            submission_title = submission.title
+            for comment in comments:
                 try:
-                    # Skip deleted/removed comments or very short ones
-                    if comment.author is None or len(comment.body.strip()) < 10:
-                        continue
-
-                    # Analyze comment sentiment
-                    comment_sentiment = utils.analyze_sentiment(comment.body)
-
                     # Create comment data
                     comment_data = {
                         'id': comment.id,
@@ -164,32 +234,63 @@ class RedditIncrementalScraper:
                         'author': str(comment.author),
                         'subreddit': str(comment.subreddit),
                         'url': f"https://reddit.com{comment.permalink}",
-                        'parent_id': submission.id,
-                        'parent_title': submission.title,
-                        'sentiment': comment_sentiment
+                        'parent_id': submission_id,
+                        'parent_title': submission_title
                     }
 
-                    data_items.append(comment_data)
-                    comments_data.append(comment_data)
+                    append_item(comment_data)
 
                 except Exception as e:
                     self.logger.warning(f"Error processing comment: {e}")
-                    self.error_count += 1
+                    self.count(errors=1)
                     continue
 
-            # Log post details
-            utils.log_post_processing(self.logger, post_data, len(comments_data))
-
         except Exception as e:
             self.logger.error(f"Error processing submission: {e}")
-            self.error_count += 1
+            self.count(errors=1)
+            return []
 
         return data_items
 
+    def add_sentiment(self, submissions: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment for several scraped submissions in one batch.
+
+        Args:
+            submissions: Item lists from extract_submission (post + comments each)
+
+        Returns:
+            Flat list of items with sentiment added
+        """
+        items = [item for submission_items in submissions for item in submission_items]
+
+        try:
+            sentiments = utils.analyze_sentiment_batch(
+                [item['text'] for item in items],
+                batch_size=config.SENTIMENT_BATCH_SIZE
+            )
+        except Exception as e:
+            self.logger.error(f"Error analyzing sentiment: {e}")
+            self.count(errors=1)
+            return []
+
+        for item, sentiment in zip(items, sentiments):
+            item['sentiment'] = sentiment
+
+        for submission_items in submissions:
+            utils.log_post_processing(self.logger, submission_items[0], len(submission_items) - 1)
+
+        return items
+
     def scrape_new_posts(self, subreddit_name: str, last_timestamp: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Scrape new posts from a subreddit since last timestamp.
 
+        A producer thread lists new submissions once, then fetches their comment
+        trees on a small worker pool (each worker on its own Reddit client) under
+        a shared token-bucket rate limit, while this thread runs sentiment analysis on what has already been
+        fetched.
+
         Args:
             subreddit_name: Name of the subreddit
             last_timestamp: Unix timestamp of last scrape (None for first run)
@@ -210,39 +311,80 @@ class RedditIncrementalScraper:
         subreddit = self.reddit.subreddit(subreddit_name)
         collected_items = []
 
-        try:
-            # Get new posts (limit to reasonable number for incremental updates)
-            limit = 20 if last_timestamp is None else 100
-            new_posts = subreddit.new(limit=limit)
-
-            posts_processed = 0
-            posts_found = 0
-
-            for submission in tqdm(new_posts, desc="Processing new posts", total=limit):
-                posts_processed += 1
-
-                # If we have a last timestamp, only process newer posts
-                if last_timestamp and submission.created_utc <= last_timestamp:
-                    continue
-
-                posts_found += 1
+        # Get new posts (limit to reasonable number for incremental updates)
+        limit = 20 if last_timestamp is None else 100
+        counts = {'processed': 0, 'found': 0}
+        submission_queue = Queue(maxsize=config.SENTIMENT_BATCH_SIZE)
+        bucket = utils.TokenBucket(rate=1 / config.RATE_LIMIT_DELAY)
+
+        def fetch_submission(submission) -> List[Dict[str, Any]]:
+            # Rate limiting (shared across fetch workers)
+            bucket.consume()
+            # Re-bind the listed submission to a client this worker holds exclusively
+            reddit = self.reddit_clients.get()
+            try:
+                return self.extract_submission(reddit.submission(id=submission.id))
+            finally:
+                self.reddit_clients.put(reddit)
+
+        def produce():
+            try:
+                # The listing already returns fully populated submissions in one request
+                new_submissions = []
+                for submission in subreddit.new(limit=limit):
+                    counts['processed'] += 1
+
+                    # If we have a last timestamp, only process newer posts
+                    if last_timestamp and submission.created_utc <= last_timestamp:
+                        continue
 
-                # Scrape submission and comments
-                items = self.scrape_submission(submission)
-                collected_items.extend(items)
+                    counts['found'] += 1
 
-                # Rate limiting
-                time.sleep(config.RATE_LIMIT_DELAY)
+                    # Skip submissions uploaded by an earlier run
+                    if submission.id in self.seen:
+                        self.count(skipped=1)
+                        continue
 
-            self.logger.info("=" * 80)
-            self.logger.info(f"Processed {posts_processed} posts, found {posts_found} new posts")
-            self.logger.info(f"Collected {len(collected_items)} items (posts + comments)")
-            self.logger.info(f"Skipped: {self.skipped_count} | Errors: {self.error_count}")
-            self.logger.info("=" * 80)
+                    new_submissions.append(submission)
+
+                # Comment trees are fetched in parallel; map() keeps listing order
+                with ThreadPoolExecutor(max_workers=config.COMMENT_FETCH_WORKERS) as pool:
+                    fetched = pool.map(fetch_submission, new_submissions)
+                    for items in tqdm(fetched, desc="Processing new posts", total=len(new_submissions)):
+                        if items:
+                            submission_queue.put(items)
+            except Exception as e:
+                self.logger.error(f"Error scraping subreddit: {e}")
+                self.count(errors=1)
+            finally:
+                submission_queue.put(None)
+
+        producer = Thread(target=produce, daemon=True)
+        producer.start()
+
+        # Consume fetched submissions, running sentiment every SENTIMENT_BATCH_SIZE items
+        pending = []
+        pending_count = 0
+        while True:
+            items = submission_queue.get()
+            if items is None:
+                break
+            pending.append(items)
+            pending_count += len(items)
+            if pending_count >= config.SENTIMENT_BATCH_SIZE:
+                collected_items.extend(self.add_sentiment(pending))
+                pending = []
+                pending_count = 0
+
+        if pending:
+            collected_items.extend(self.add_sentiment(pending))
+        producer.join()
 
-        except Exception as e:
-            self.logger.error(f"Error scraping subreddit: {e}")
-            self.error_count += 1
+        self.logger.info("=" * 80)
+        self.logger.info(f"Processed {counts['processed']} posts, found {counts['found']} new posts")
+        self.logger.info(f"Collected {len(collected_items)} items (posts + comments)")
+        self.logger.info(f"Skipped: {self.skipped_count} | Errors: {self.error_count}")
+        self.logger.info("=" * 80)
 
         return collected_items
 
@@ -289,16 +431,32 @@ class RedditIncrementalScraper:
         # Process and upload
         if all_data:
             # Upload to Pinecone
+            stored_ids = set()
             uploaded_count = utils.process_and_upload_to_pinecone(
                 data_items=all_data,
                 source_platform='reddit',
                 index_name=config.PINECONE_INDEX_NAME,
                 api_key=config.PINECONE_API_KEY,
                 metadata_creator_func=create_reddit_metadata,
-                logger=self.logger
+                metadata_batch_creator_func=create_reddit_metadata_batch,
+                logger=self.logger,
+                namespace_by_week=config.PINECONE_WEEKLY_NAMESPACES,
+                upsert_batch_size=config.UPSERT_BATCH_SIZE,
+                upsert_pool_threads=config.UPSERT_POOL_THREADS,
+                embedding_batch_size=config.EMBEDDING_BATCH_SIZE,
+                stored_ids=stored_ids,
+                preprocess_func=add_reddit_locations
             )
             stats['total_items_uploaded'] = uploaded_count
 
+            # Remember stored IDs so later runs skip them before any inference.
+            # Items that failed to upload stay unseen, but are only retried if
+            # they are listed again: a failed comment under a submission that
+            # was stored is not revisited, since seen submissions are skipped whole
+            for item_id in stored_ids:
+                self.seen.add(item_id)
+            utils.save_seen_ids(self.state_file, self.seen)
+
             # Save updated state
             if utils.save_state(self.state_file, self.state):
                 self.logger.info(f"Saved state to {self.state_file}")
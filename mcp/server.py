@@ -9,23 +9,49 @@ from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 from typing import Any
 import asyncio
+import functools
+import itertools
+import json
+import time
+
+# Faster response serialization when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Import tool functions
 from tools.search import search_sentiment
 from tools.analytics import get_sentiment_summary, compare_sentiment, get_trending_topics
-from tools.fetch import fetch_recent_posts
+from tools.fetch import fetch_recent_posts, fetch_recent_posts_json
+import config
 
 
 # Initialize MCP server
 server = Server("ttime-sentiment")
 
+# Tool calls started with background=true, keyed by call id until their results are collected
+background_calls: dict[str, asyncio.Task] = {}
+background_call_ids = itertools.count(1)
+
+# Finish time (time.monotonic()) of each finished background call, oldest first
+background_finished: dict[str, float] = {}
+
+# Added to every tool's input schema
+BACKGROUND_PROPERTY = {
+    "type": "boolean",
+    "description": "Run the tool in the background and return a call_id immediately; collect the result later with await_results",
+    "default": False
+}
+
 
 @server.list_tools()
 async def list_tools() -> list[Tool]:
     """
     List all available tools for sentiment analysis.
     """
-    return [
+    tools = [
         Tool(
             name="search_sentiment",
             description="Perform semantic search across customer sentiment data from Reddit, Threads, and Consumer Affairs. Returns posts/comments most relevant to the query.",
@@ -198,75 +224,189 @@ async def list_tools() -> list[Tool]:
             }
         )
     ]
+    for tool in tools:
+        tool.inputSchema["properties"]["background"] = BACKGROUND_PROPERTY
 
+    tools.append(
+        Tool(
+            name="await_results",
+            description="Wait for tool calls started with background=true and return their results. Pending calls are listed in every background response.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "call_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Call ids returned by background tool calls"
+                    },
+                    "timeout_seconds": {
+                        "type": "number",
+                        "description": "Maximum time to wait for the calls to finish",
+                        "default": 30
+                    }
+                },
+                "required": ["call_ids"]
+            }
+        )
+    )
+    return tools
 
-@server.call_tool()
-async def call_tool(name: str, arguments: Any) -> list[TextContent]:
+
+# Tool name -> (function, required arguments, optional arguments with their defaults)
+_DISPATCH = {
+    "search_sentiment": (
+        search_sentiment,
+        ("query",),
+        {"platform": "all", "timeframe_days": None, "sentiment_filter": None, "limit": 10}
+    ),
+    "get_sentiment_summary": (
+        get_sentiment_summary,
+        (),
+        {"platform": "all", "timeframe_days": 30, "group_by": "platform"}
+    ),
+    "compare_sentiment": (
+        compare_sentiment,
+        ("period1_days", "period2_days"),
+        {"platform": "all"}
+    ),
+    "get_trending_topics": (
+        get_trending_topics,
+        (),
+        {"platform": "all", "timeframe_days": 7, "min_mentions": 3}
+    ),
+    "fetch_recent_posts": (
+        fetch_recent_posts,
+        (),
+        {"platform": "all", "sentiment": "all", "timeframe_days": 7, "post_type": None, "limit": 20, "sort_by": "timestamp"}
+    ),
+}
+
+
+def dumps(data: Any) -> str:
+    """Serialize a tool response to compact JSON (NumPy scalars and arrays allowed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(data, separators=(",", ":"))
+
+
+# Tools that can write their response as JSON text directly
+_TEXT_VARIANTS = {
+    "fetch_recent_posts": fetch_recent_posts_json,
+}
+
+
+async def run_tool(name: str, arguments: Any, as_text: bool = False) -> Any:
     """
-    Handle tool calls from agents.
+    Route a tool call to the appropriate tool function.
+
+    With as_text=True, tools that can serialize their own response return a
+    JSON string instead of a dict.
     """
-    import json
+    if name not in _DISPATCH:
+        raise ValueError(f"Unknown tool: {name}")
 
-    try:
-        # Route to appropriate tool function
-        if name == "search_sentiment":
-            result = await search_sentiment(
-                query=arguments["query"],
-                platform=arguments.get("platform", "all"),
-                timeframe_days=arguments.get("timeframe_days"),
-                sentiment_filter=arguments.get("sentiment_filter"),
-                limit=arguments.get("limit", 10)
-            )
+    func, required, defaults = _DISPATCH[name]
+    if as_text:
+        func = _TEXT_VARIANTS.get(name, func)
+    kwargs = {key: arguments[key] for key in required}
+    kwargs.update({key: arguments.get(key, default) for key, default in defaults.items()})
+    return await func(**kwargs)
 
-        elif name == "get_sentiment_summary":
-            result = await get_sentiment_summary(
-                platform=arguments.get("platform", "all"),
-                timeframe_days=arguments.get("timeframe_days", 30),
-                group_by=arguments.get("group_by", "platform")
-            )
 
-        elif name == "compare_sentiment":
-            result = await compare_sentiment(
-                period1_days=arguments["period1_days"],
-                period2_days=arguments["period2_days"],
-                platform=arguments.get("platform", "all")
-            )
+def _background_call_done(call_id: str, task: asyncio.Task):
+    """
+    Record when a background call finished and mark its exception as retrieved.
+    """
+    if not task.cancelled():
+        task.exception()
+    if call_id in background_calls:
+        background_finished[call_id] = time.monotonic()
 
-        elif name == "get_trending_topics":
-            result = await get_trending_topics(
-                platform=arguments.get("platform", "all"),
-                timeframe_days=arguments.get("timeframe_days", 7),
-                min_mentions=arguments.get("min_mentions", 3)
-            )
 
-        elif name == "fetch_recent_posts":
-            result = await fetch_recent_posts(
-                platform=arguments.get("platform", "all"),
-                sentiment=arguments.get("sentiment", "all"),
-                timeframe_days=arguments.get("timeframe_days", 7),
-                post_type=arguments.get("post_type"),
-                limit=arguments.get("limit", 20),
-                sort_by=arguments.get("sort_by", "timestamp")
+def _prune_background_calls():
+    """
+    Drop finished background calls that expired or exceed the retention cap.
+    """
+    expiry = time.monotonic() - config.BACKGROUND_RESULT_TTL
+    excess = len(background_finished) - config.MAX_BACKGROUND_RESULTS
+    for call_id, finished_at in list(background_finished.items()):
+        if finished_at >= expiry and excess <= 0:
+            break
+        del background_finished[call_id]
+        del background_calls[call_id]
+        excess -= 1
+
+
+async def await_results(call_ids: list[str], timeout_seconds: float = 30) -> dict:
+    """
+    Wait for background tool calls and collect the results of those that finished.
+    """
+    call_ids = list(dict.fromkeys(call_ids))  # Drop repeated ids, keeping order
+    tasks = {call_id: background_calls[call_id] for call_id in call_ids if call_id in background_calls}
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=timeout_seconds)
+
+    results = {}
+    for call_id in call_ids:
+        task = tasks.get(call_id)
+        if task is None:
+            results[call_id] = {"status": "unknown", "error": f"No background call with id {call_id}"}
+        elif not task.done():
+            results[call_id] = {"status": "pending"}
+        else:
+            background_calls.pop(call_id, None)
+            background_finished.pop(call_id, None)
+            if task.exception() is not None:
+                results[call_id] = {"status": "error", "error": str(task.exception())}
+            else:
+                results[call_id] = {"status": "ready", "result": task.result()}
+
+    return {"results": results, "pending_call_ids": list(background_calls)}
+
+
+@server.call_tool()
+async def call_tool(name: str, arguments: Any) -> list[TextContent]:
+    """
+    Handle tool calls from agents.
+    """
+    try:
+        if name == "await_results":
+            result = await await_results(
+                call_ids=arguments["call_ids"],
+                timeout_seconds=arguments.get("timeout_seconds", 30)
             )
 
+        elif arguments.get("background"):
+            # Start the tool and return a handle so the agent can keep reasoning
+            _prune_background_calls()
+            call_id = f"{name}-{next(background_call_ids)}"
+            task = asyncio.create_task(run_tool(name, arguments))
+            task.add_done_callback(functools.partial(_background_call_done, call_id))
+            background_calls[call_id] = task
+            result = {
+                "status": "running",
+                "call_id": call_id,
+                "pending_call_ids": list(background_calls)
+            }
+
         else:
-            raise ValueError(f"Unknown tool: {name}")
+            result = await run_tool(name, arguments, as_text=True)
 
-        # Format response
+        # Format response (compact; the client does not need pretty-printing)
         return [TextContent(
             type="text",
-            text=json.dumps(result, indent=2)
+            text=result if isinstance(result, str) else dumps(result)
         )]
 
     except Exception as e:
         # Return error information
         return [TextContent(
             type="text",
-            text=json.dumps({
+            text=dumps({
                 "error": str(e),
                 "tool": name,
                 "arguments": arguments
-            }, indent=2)
+            })
         )]
 
 
@@ -4,18 +4,143 @@ Analytics tools for sentiment aggregation and trend analysis
 
 import sys
 import os
-from typing import Dict, List, Any, Optional
-from collections import Counter
+import re
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import time
+from collections import Counter
+import numpy as np
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import get_pinecone_index
+from utils import get_pinecone_index, aquery_time_window, aquery_namespaces, rollup_day, ROLLUP_KEY_PREFIX, ROLLUP_FIELDS
+from .cache import cached_result, get_redis
 import config
 
 
+# Common words to ignore in trending topics
+_STOPWORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'is', 'was', 'are', 'been', 'be', 'have',
+    'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
+    'may', 'might', 'can', 'this', 'that', 'these', 'those', 'i', 'you',
+    'he', 'she', 'it', 'we', 'they', 'my', 'your', 'his', 'her', 'its',
+    'our', 'their', 'me', 'him', 'them', 'us'
+])
+
+# Metadata each tool reads from scanned matches; everything else is dropped on arrival
+_SUMMARY_FIELDS = ("sentiment_label", "sentiment_score", "source_platform")
+_COMPARE_FIELDS = ("sentiment_label", "sentiment_score", "timestamp")
+_TRENDING_FIELDS = ("text", "sentiment_score")
+
+# Characters dropped from words before counting (everything but letters, digits, and whitespace)
+_NON_ALNUM_RE = re.compile(r"[^\w\s]|_")
+
+
+def _label_score_arrays(matches) -> Tuple[np.ndarray, np.ndarray]:
+    """Extract sentiment labels and scores from query matches as NumPy arrays."""
+    count = len(matches)
+    labels = np.array([m.metadata.get("sentiment_label", "UNKNOWN") for m in matches], dtype="U8")
+    scores = np.fromiter(
+        (m.metadata.get("sentiment_score", 0) for m in matches), dtype=np.float64, count=count
+    )
+    return labels, scores
+
+
+async def _query_namespaces(index, start_timestamp: float, end_timestamp: float) -> Optional[List[str]]:
+    """Namespaces a window scan must cover, or None when vectors are not namespaced by week."""
+    if not config.PINECONE_WEEKLY_NAMESPACES:
+        return None
+    return await aquery_namespaces(index, start_timestamp, end_timestamp)
+
+
+async def _rollup_totals(platform: str, start_timestamp: float, end_timestamp: float) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Sum the scrapers' daily sentiment rollups over the UTC days of a window.
+
+    Whole days are summed, so the first (partial) day of the window is counted
+    in full.
+
+    Args:
+        platform: Platform name, or "all"
+        start_timestamp: Window start (Unix timestamp)
+        end_timestamp: Window end (Unix timestamp)
+
+    Returns:
+        Platform -> [count, positive, negative, score_sum], or None if rollups
+        are disabled, unavailable, or do not cover the window
+    """
+    client = get_redis()
+    if not config.ENABLE_SENTIMENT_ROLLUPS or client is None:
+        return None
+
+    try:
+        since = await client.get(f"{ROLLUP_KEY_PREFIX}:since")
+        first_day = rollup_day(start_timestamp)
+        if since is None or first_day < since.decode():
+            return None
+
+        days = [rollup_day(ts) for ts in np.arange(start_timestamp, end_timestamp, 86400)]
+        if rollup_day(end_timestamp) != days[-1]:
+            days.append(rollup_day(end_timestamp))
+
+        if platform == "all":
+            platforms = sorted(p.decode() for p in await client.smembers(f"{ROLLUP_KEY_PREFIX}:platforms"))
+        else:
+            platforms = [platform]
+        if not platforms:
+            return {}
+
+        keys = [
+            f"{ROLLUP_KEY_PREFIX}:{plat}:{day}:{field}"
+            for plat in platforms for day in days for field in ROLLUP_FIELDS
+        ]
+        values = await client.mget(keys)
+    except Exception as e:
+        print(f"Sentiment rollups unavailable, scanning instead: {e}", file=sys.stderr)
+        return None
+
+    totals = np.array([float(v) if v is not None else 0.0 for v in values])
+    totals = totals.reshape(len(platforms), len(days), len(ROLLUP_FIELDS)).sum(axis=1)
+    return dict(zip(platforms, totals))
+
+
+def _summary_from_rollups(platform: str, timeframe_days: int, group_by: str, totals: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Build the get_sentiment_summary response from per-platform rollup totals."""
+    total_count, positive_count, negative_count, score_sum = (
+        sum(totals.values()) if totals else np.zeros(len(ROLLUP_FIELDS))
+    ).tolist()
+    total_count, positive_count, negative_count = int(total_count), int(positive_count), int(negative_count)
+
+    summary = {
+        "timeframe_days": timeframe_days,
+        "platform": platform,
+        "total_posts": total_count,
+        "positive_count": positive_count,
+        "negative_count": negative_count,
+        "positive_percentage": (positive_count / total_count * 100) if total_count > 0 else 0,
+        "negative_percentage": (negative_count / total_count * 100) if total_count > 0 else 0,
+        "average_sentiment_score": round(score_sum / total_count, 4) if total_count else 0,
+    }
+
+    if group_by == "platform" and total_count:
+        summary["by_platform"] = {}
+        for plat, (count, positive, negative, plat_score_sum) in totals.items():
+            if not count:
+                continue
+            summary["by_platform"][plat] = {
+                "count": int(count),
+                "positive": int(positive),
+                "negative": int(negative),
+                "positive_percentage": positive / count * 100,
+                "average_sentiment_score": round(plat_score_sum / count, 4)
+            }
+
+    return summary
+
+
+@cached_result(ttl=config.RESULT_CACHE_TTL)
 async def get_sentiment_summary(
     platform: str = "all",
     timeframe_days: int = 30,
@@ -40,61 +165,36 @@ async def get_sentiment_summary(
     )
 
     # Calculate cutoff timestamp
-    cutoff_timestamp = time.time() - (timeframe_days * 24 * 60 * 60)
+    now = time.time()
+    cutoff_timestamp = now - (timeframe_days * 24 * 60 * 60)
+
+    # Precomputed daily rollups answer the summary without scanning Pinecone
+    totals = await _rollup_totals(platform, cutoff_timestamp, now)
+    if totals is not None:
+        return _summary_from_rollups(platform, timeframe_days, group_by, totals)
 
     # Build filter
-    filter_dict = {"timestamp": {"$gte": cutoff_timestamp}}
+    filter_dict = {}
     if platform != "all":
         filter_dict["source_platform"] = platform
 
     # Query all matching vectors (using a dummy vector for metadata filtering)
-    # Note: Pinecone requires a vector query, so we'll fetch in batches
-    results = index.query(
-        vector=[0.0] * 768,  # Dummy vector
-        top_k=10000,  # Maximum allowed
-        include_metadata=True,
-        filter=filter_dict
+    # Note: Pinecone caps each query at top_k, so full windows are split and fetched concurrently
+    matches = await aquery_time_window(
+        index, filter_dict, cutoff_timestamp, now, metadata_fields=_SUMMARY_FIELDS,
+        namespaces=await _query_namespaces(index, cutoff_timestamp, now)
     )
 
     # Aggregate data
-    total_count = len(results.matches)
-    positive_count = 0
-    negative_count = 0
-    sentiment_scores = []
-    platform_stats = {}
-
-    for match in results.matches:
-        metadata = match.metadata
-        sentiment_label = metadata.get("sentiment_label", "UNKNOWN")
-        sentiment_score = metadata.get("sentiment_score", 0)
-        source_platform = metadata.get("source_platform", "unknown")
-
-        # Count sentiment labels
-        if sentiment_label == "POSITIVE":
-            positive_count += 1
-        elif sentiment_label == "NEGATIVE":
-            negative_count += 1
-
-        sentiment_scores.append(sentiment_score)
-
-        # Group by platform if requested
-        if group_by == "platform":
-            if source_platform not in platform_stats:
-                platform_stats[source_platform] = {
-                    "count": 0,
-                    "positive": 0,
-                    "negative": 0,
-                    "scores": []
-                }
-            platform_stats[source_platform]["count"] += 1
-            if sentiment_label == "POSITIVE":
-                platform_stats[source_platform]["positive"] += 1
-            elif sentiment_label == "NEGATIVE":
-                platform_stats[source_platform]["negative"] += 1
-            platform_stats[source_platform]["scores"].append(sentiment_score)
+    total_count = len(matches)
+    labels, scores = _label_score_arrays(matches)
+    is_positive = labels == "POSITIVE"
+    is_negative = labels == "NEGATIVE"
+    positive_count = int(is_positive.sum())
+    negative_count = int(is_negative.sum())
 
     # Calculate averages
-    avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
+    avg_sentiment = float(scores.mean()) if total_count else 0
 
     # Build response
     summary = {
@@ -108,21 +208,57 @@ async def get_sentiment_summary(
         "average_sentiment_score": round(avg_sentiment, 4),
     }
 
-    if group_by == "platform" and platform_stats:
+    # Group by platform in one pass: per-platform counts and sums via bincount
+    if group_by == "platform" and total_count:
+        platforms = np.array([m.metadata.get("source_platform", "unknown") for m in matches])
+        platform_names, platform_idx = np.unique(platforms, return_inverse=True)
+        counts = np.bincount(platform_idx)
+        positives = np.bincount(platform_idx, weights=is_positive)
+        negatives = np.bincount(platform_idx, weights=is_negative)
+        score_sums = np.bincount(platform_idx, weights=scores)
+
         summary["by_platform"] = {}
-        for plat, stats in platform_stats.items():
-            avg_score = sum(stats["scores"]) / len(stats["scores"]) if stats["scores"] else 0
+        for plat, count, positive, negative, score_sum in zip(
+            platform_names.tolist(), counts.tolist(), positives.tolist(), negatives.tolist(), score_sums.tolist()
+        ):
             summary["by_platform"][plat] = {
-                "count": stats["count"],
-                "positive": stats["positive"],
-                "negative": stats["negative"],
-                "positive_percentage": (stats["positive"] / stats["count"] * 100) if stats["count"] > 0 else 0,
-                "average_sentiment_score": round(avg_score, 4)
+                "count": count,
+                "positive": int(positive),
+                "negative": int(negative),
+                "positive_percentage": positive / count * 100,
+                "average_sentiment_score": round(score_sum / count, 4)
             }
 
     return summary
 
 
+def _window_stats(labels: np.ndarray, scores: np.ndarray) -> Dict[str, Any]:
+    """
+    Summarize sentiment labels and scores for one time window.
+
+    Args:
+        labels: Sentiment labels of the window's posts
+        scores: Sentiment scores of the window's posts
+
+    Returns:
+        Dictionary with counts, percentages, and average sentiment score
+    """
+    total_count = len(labels)
+    positive_count = int((labels == "POSITIVE").sum())
+    negative_count = int((labels == "NEGATIVE").sum())
+    avg_sentiment = float(scores.mean()) if total_count else 0
+
+    return {
+        "total_posts": total_count,
+        "positive_count": positive_count,
+        "negative_count": negative_count,
+        "positive_percentage": (positive_count / total_count * 100) if total_count > 0 else 0,
+        "negative_percentage": (negative_count / total_count * 100) if total_count > 0 else 0,
+        "average_sentiment_score": round(avg_sentiment, 4)
+    }
+
+
+@cached_result(ttl=config.RESULT_CACHE_TTL)
 async def compare_sentiment(
     period1_days: int,
     period2_days: int,
@@ -140,50 +276,37 @@ async def compare_sentiment(
         Dictionary with comparison statistics and trends
     """
 
-    # Get data for both periods
-    period1 = await get_sentiment_summary(platform, period1_days, "overall")
-
-    # For period 2, we need to query from period1_days ago to period2_days ago
-    # This requires a custom query
     index = get_pinecone_index(
         config.PINECONE_INDEX_NAME,
         config.PINECONE_API_KEY
     )
 
-    # Period 2: from (period1_days + period2_days) ago to period1_days ago
-    start_timestamp = time.time() - ((period1_days + period2_days) * 24 * 60 * 60)
-    end_timestamp = time.time() - (period1_days * 24 * 60 * 60)
+    # Period 1: the last period1_days; period 2: from (period1_days + period2_days) ago to period1_days ago
+    now = time.time()
+    period1_start = now - (period1_days * 24 * 60 * 60)
+    period2_start = now - ((period1_days + period2_days) * 24 * 60 * 60)
 
-    filter_dict = {
-        "timestamp": {
-            "$gte": start_timestamp,
-            "$lte": end_timestamp
-        }
-    }
+    filter_dict = {}
     if platform != "all":
         filter_dict["source_platform"] = platform
 
-    results = index.query(
-        vector=[0.0] * 768,
-        top_k=10000,
-        include_metadata=True,
-        filter=filter_dict
+    # Fetch both periods in one query, then split them by timestamp
+    matches = await aquery_time_window(
+        index, filter_dict, period2_start, now, metadata_fields=_COMPARE_FIELDS,
+        namespaces=await _query_namespaces(index, period2_start, now)
     )
+    labels, scores = _label_score_arrays(matches)
+    timestamps = np.fromiter(
+        (m.metadata.get("timestamp", 0) for m in matches), dtype=np.float64, count=len(matches)
+    )
+    in_period1 = timestamps >= period1_start
 
-    # Calculate period 2 stats
-    total_count = len(results.matches)
-    positive_count = sum(1 for m in results.matches if m.metadata.get("sentiment_label") == "POSITIVE")
-    negative_count = sum(1 for m in results.matches if m.metadata.get("sentiment_label") == "NEGATIVE")
-    scores = [m.metadata.get("sentiment_score", 0) for m in results.matches]
-    avg_sentiment = sum(scores) / len(scores) if scores else 0
-
-    period2 = {
-        "total_posts": total_count,
-        "positive_count": positive_count,
-        "negative_count": negative_count,
-        "positive_percentage": (positive_count / total_count * 100) if total_count > 0 else 0,
-        "average_sentiment_score": round(avg_sentiment, 4)
+    period1 = {
+        "timeframe_days": period1_days,
+        "platform": platform,
+        **_window_stats(labels[in_period1], scores[in_period1])
     }
+    period2 = _window_stats(labels[~in_period1], scores[~in_period1])
 
     # Calculate changes
     sentiment_change = period1["average_sentiment_score"] - period2["average_sentiment_score"]
@@ -209,6 +332,7 @@ async def compare_sentiment(
     }
 
 
+@cached_result(ttl=config.TRENDING_CACHE_TTL)
 async def get_trending_topics(
     platform: str = "all",
     timeframe_days: int = 7,
@@ -233,63 +357,58 @@ async def get_trending_topics(
     )
 
     # Calculate cutoff timestamp
-    cutoff_timestamp = time.time() - (timeframe_days * 24 * 60 * 60)
+    now = time.time()
+    cutoff_timestamp = now - (timeframe_days * 24 * 60 * 60)
 
-    filter_dict = {"timestamp": {"$gte": cutoff_timestamp}}
+    filter_dict = {}
     if platform != "all":
         filter_dict["source_platform"] = platform
 
-    results = index.query(
-        vector=[0.0] * 768,
-        top_k=10000,
-        include_metadata=True,
-        filter=filter_dict
+    matches = await aquery_time_window(
+        index, filter_dict, cutoff_timestamp, now, metadata_fields=_TRENDING_FIELDS,
+        namespaces=await _query_namespaces(index, cutoff_timestamp, now)
     )
 
     # Extract keywords from text (simple word frequency)
     # In production, you'd use proper NLP for topic extraction
+    # Mentions count every occurrence; sentiment is averaged over the posts mentioning a
+    # word, so a post repeating a word does not weigh its sentiment more than once
     word_counts = Counter()
-    word_sentiments = {}
+    post_counts = Counter()
+    score_sums = Counter()
 
-    # Common words to ignore
-    stopwords = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-                     'of', 'with', 'by', 'from', 'is', 'was', 'are', 'been', 'be', 'have',
-                     'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
-                     'may', 'might', 'can', 'this', 'that', 'these', 'those', 'i', 'you',
-                     'he', 'she', 'it', 'we', 'they', 'my', 'your', 'his', 'her', 'its',
-                     'our', 'their', 'me', 'him', 'them', 'us'])
-
-    for match in results.matches:
+    for match in matches:
         text = match.metadata.get("text", "").lower()
         sentiment = match.metadata.get("sentiment_score", 0)
 
-        # Simple word extraction
-        words = text.split()
-        for word in words:
-            # Clean word
-            word = ''.join(c for c in word if c.isalnum())
-            if len(word) > 3 and word not in stopwords:
-                word_counts[word] += 1
-                if word not in word_sentiments:
-                    word_sentiments[word] = []
-                word_sentiments[word].append(sentiment)
+        # Simple word extraction: strip non-alphanumerics, keep longer non-stopwords
+        match_words = [
+            word for word in _NON_ALNUM_RE.sub("", text).split()
+            if len(word) > 3 and word not in _STOPWORDS
+        ]
+        word_counts.update(match_words)
+
+        unique_words = set(match_words)
+        post_counts.update(unique_words)
+        for word in unique_words:
+            score_sums[word] += sentiment
 
     # Filter by minimum mentions and get top topics
     trending = []
     for word, count in word_counts.most_common(20):
-        if count >= min_mentions:
-            sentiments = word_sentiments[word]
-            avg_sentiment = sum(sentiments) / len(sentiments)
-            trending.append({
-                "keyword": word,
-                "mentions": count,
-                "average_sentiment": round(avg_sentiment, 4),
-                "sentiment_label": "positive" if avg_sentiment > 0 else "negative"
-            })
+        if count < min_mentions:
+            break
+        avg_sentiment = score_sums[word] / post_counts[word]
+        trending.append({
+            "keyword": word,
+            "mentions": count,
+            "average_sentiment": round(avg_sentiment, 4),
+            "sentiment_label": "positive" if avg_sentiment > 0 else "negative"
+        })
 
     return {
         "platform": platform,
         "timeframe_days": timeframe_days,
-        "total_posts_analyzed": len(results.matches),
+        "total_posts_analyzed": len(matches),
         "trending_topics": trending
     }
@@ -0,0 +1,169 @@
+"""
+Caches for MCP tools
+
+Aggregates over multi-day windows change slowly, so repeated tool calls with
+the same arguments within a few minutes reuse the previous result instead of
+re-fetching up to 10,000 vectors from Pinecone. Query embeddings are
+deterministic and are cached for much longer.
+"""
+
+import sys
+import os
+import json
+import time
+import hashlib
+import inspect
+import functools
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Optional shared cache
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Add parent directory to path to import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import agenerate_embedding
+import config
+
+
+# In-process fallback: key -> (expires_at, JSON string)
+_local_cache: Dict[str, Tuple[float, str]] = {}
+redis_client = None
+
+# Query text -> embedding, least recently used first
+_query_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+QUERY_EMBEDDING_TTL = 86400  # seconds (Redis)
+
+
+def get_redis():
+    """Get the shared Redis client, or None if Redis caching is disabled or unavailable."""
+    global redis_client
+    if redis_client is None and config.ENABLE_REDIS_CACHE and REDIS_AVAILABLE:
+        redis_client = aioredis.Redis.from_url(config.REDIS_URL)
+    return redis_client
+
+
+def result_cache_key(tool: str, arguments: Dict[str, Any]) -> str:
+    """Build a cache key from a tool name and its (JSON-serializable) arguments."""
+    digest = hashlib.sha1(json.dumps(arguments, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"ttime:{tool}:{digest}"
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    """Look up a cached result, trying Redis first and then the local cache."""
+    client = get_redis()
+    if client is not None:
+        try:
+            cached = await client.get(key)
+            if cached is not None:
+                return json.loads(cached)
+        except Exception as e:
+            print(f"Redis cache read failed: {e}", file=sys.stderr)
+
+    entry = _local_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, cached = entry
+    if expires_at < time.monotonic():
+        del _local_cache[key]
+        return None
+    return json.loads(cached)
+
+
+async def cache_set(key: str, value: Any, ttl: int):
+    """Store a result in Redis (if enabled) and in the local cache."""
+    serialized = json.dumps(value)
+
+    client = get_redis()
+    if client is not None:
+        try:
+            await client.setex(key, ttl, serialized)
+        except Exception as e:
+            print(f"Redis cache write failed: {e}", file=sys.stderr)
+
+    now = time.monotonic()
+    _local_cache[key] = (now + ttl, serialized)
+
+    # Drop expired entries so the local cache stays bounded
+    if len(_local_cache) > 1024:
+        for stale_key in [k for k, (expires_at, _) in _local_cache.items() if expires_at < now]:
+            del _local_cache[stale_key]
+
+
+def cached_result(ttl: int):
+    """
+    Cache an async tool's result for `ttl` seconds, keyed on its arguments.
+
+    Args:
+        ttl: Time to live in seconds
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = result_cache_key(func.__name__, bound.arguments)
+
+            cached = await cache_get(key)
+            if cached is not None:
+                return cached
+
+            result = await func(*args, **kwargs)
+            await cache_set(key, result, ttl)
+            return result
+
+        return wrapper
+    return decorator
+
+
+async def get_query_embedding(query: str) -> List[float]:
+    """
+    Get the embedding for a search query, reusing earlier results.
+
+    Checks an in-process LRU cache, then Redis (if enabled), and only runs the
+    embedding model on a miss.
+
+    Args:
+        query: Search query text
+
+    Returns:
+        List of floats representing the embedding vector
+    """
+    embedding = _query_embeddings.get(query)
+    if embedding is not None:
+        _query_embeddings.move_to_end(query)
+        return embedding
+
+    key = f"ttime:emb:query:{hashlib.sha1(query.encode('utf-8')).hexdigest()}"
+    client = get_redis()
+    if client is not None:
+        try:
+            cached = await client.get(key)
+            if cached is not None:
+                embedding = np.frombuffer(cached, dtype=np.float32).tolist()
+        except Exception as e:
+            print(f"Redis cache read failed: {e}", file=sys.stderr)
+
+    if embedding is None:
+        vector = await agenerate_embedding(query)
+        if client is not None:
+            try:
+                await client.setex(key, QUERY_EMBEDDING_TTL, vector.tobytes())
+            except Exception as e:
+                print(f"Redis cache write failed: {e}", file=sys.stderr)
+        embedding = vector.tolist()
+
+    _query_embeddings[query] = embedding
+    if len(_query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+        _query_embeddings.popitem(last=False)
+    return embedding
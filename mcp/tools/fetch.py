@@ -6,39 +6,57 @@ import sys
 import os
 from typing import Dict, List, Any, Optional
 import time
+import heapq
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import get_pinecone_index
+from utils import get_pinecone_index, aquery_matches, aquery_namespaces, json_dumps
 import config
 
 
-async def fetch_recent_posts(
-    platform: str = "all",
-    sentiment: str = "all",
-    timeframe_days: int = 7,
-    post_type: Optional[str] = None,
-    limit: int = 20,
-    sort_by: str = "timestamp"
-) -> Dict[str, Any]:
-    """
-    Fetch recent posts with optional filtering.
+# Sort keys for fetch_recent_posts, applied to raw Pinecone matches (largest first)
+_SORT_KEYS = {
+    "timestamp": lambda m: m.metadata.get("timestamp", 0),
+    "sentiment_score": lambda m: abs(m.metadata.get("sentiment_score", 0)),
+    "upvotes": lambda m: m.metadata.get("upvotes", 0),
+}
 
-    Args:
-        platform: Filter by platform (reddit, consumer-affairs, pissedconsumer, or all)
-        sentiment: Filter by sentiment (positive, negative, or all)
-        timeframe_days: Number of days to look back
-        post_type: Filter by type (post, comment, reply, review, or None for all)
-        limit: Maximum number of posts to return
-        sort_by: Sort results by (timestamp, sentiment_score, upvotes)
 
-    Returns:
-        Dictionary containing:
-        - filters: Applied filters
-        - count: Number of results
-        - posts: List of posts with full metadata
-    """
+def _post_from_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a post response dict from a match's metadata."""
+    return {
+        "text": metadata.get("text", ""),
+        "sentiment_score": metadata.get("sentiment_score", 0),
+        "sentiment_label": metadata.get("sentiment_label", "UNKNOWN"),
+        "platform": metadata.get("source_platform", ""),
+        "post_type": metadata.get("post_type", ""),
+        "author": metadata.get("author", ""),
+        "url": metadata.get("url", ""),
+        "timestamp": metadata.get("datetime", ""),
+        "upvotes": metadata.get("upvotes", 0),
+        "source_id": metadata.get("source_identifier", ""),
+        # Platform-specific metadata
+        "subreddit": metadata.get("subreddit", ""),
+        "title": metadata.get("title", ""),
+        "rating": metadata.get("rating", None),
+        "location": {
+            "city": metadata.get("location_city", ""),
+            "state": metadata.get("location_state", "") or metadata.get("location_region", ""),
+            "country": metadata.get("location_country", "")
+        } if (metadata.get("location_city") or metadata.get("location_state") or metadata.get("location_region")) else None
+    }
+
+
+async def _fetch_top_matches(
+    platform: str,
+    sentiment: str,
+    timeframe_days: int,
+    post_type: Optional[str],
+    limit: int,
+    sort_by: str
+) -> List[Any]:
+    """Query Pinecone for recent posts and return the top `limit` raw matches."""
 
     # Get Pinecone index
     index = get_pinecone_index(
@@ -64,51 +82,56 @@ async def fetch_recent_posts(
     if post_type:
         filter_dict["post_type"] = post_type
 
+    # Weekly namespaces: query every namespace the timeframe overlaps
+    namespaces = None
+    if config.PINECONE_WEEKLY_NAMESPACES:
+        namespaces = await aquery_namespaces(index, cutoff_timestamp)
+
     # Query Pinecone
     # Use dummy vector for metadata-only query
-    results = index.query(
+    matches = await aquery_matches(
+        index,
+        namespaces=namespaces,
         vector=[0.0] * 768,
         top_k=min(limit * 2, 10000),  # Fetch extra for sorting
         include_metadata=True,
         filter=filter_dict
     )
 
-    # Format and sort results
-    posts = []
-    for match in results.matches:
-        metadata = match.metadata
-        posts.append({
-            "text": metadata.get("text", ""),
-            "sentiment_score": metadata.get("sentiment_score", 0),
-            "sentiment_label": metadata.get("sentiment_label", "UNKNOWN"),
-            "platform": metadata.get("source_platform", ""),
-            "post_type": metadata.get("post_type", ""),
-            "author": metadata.get("author", ""),
-            "url": metadata.get("url", ""),
-            "timestamp": metadata.get("datetime", ""),
-            "upvotes": metadata.get("upvotes", 0),
-            "source_id": metadata.get("source_identifier", ""),
-            # Platform-specific metadata
-            "subreddit": metadata.get("subreddit", ""),
-            "title": metadata.get("title", ""),
-            "rating": metadata.get("rating", None),
-            "location": {
-                "city": metadata.get("location_city", ""),
-                "state": metadata.get("location_state", "") or metadata.get("location_region", ""),
-                "country": metadata.get("location_country", "")
-            } if (metadata.get("location_city") or metadata.get("location_state") or metadata.get("location_region")) else None
-        })
-
-    # Sort results
-    if sort_by == "timestamp":
-        posts.sort(key=lambda x: x["timestamp"], reverse=True)
-    elif sort_by == "sentiment_score":
-        posts.sort(key=lambda x: abs(x["sentiment_score"]), reverse=True)
-    elif sort_by == "upvotes":
-        posts.sort(key=lambda x: x["upvotes"], reverse=True)
-
-    # Limit results
-    posts = posts[:limit]
+    # Select the top `limit` raw matches (bounded heap) before building response dicts
+    sort_key = _SORT_KEYS.get(sort_by)
+    if sort_key is not None:
+        return heapq.nlargest(limit, matches, key=sort_key)
+    return matches[:limit]
+
+
+async def fetch_recent_posts(
+    platform: str = "all",
+    sentiment: str = "all",
+    timeframe_days: int = 7,
+    post_type: Optional[str] = None,
+    limit: int = 20,
+    sort_by: str = "timestamp"
+) -> Dict[str, Any]:
+    """
+    Fetch recent posts with optional filtering.
+
+    Args:
+        platform: Filter by platform (reddit, consumer-affairs, pissedconsumer, or all)
+        sentiment: Filter by sentiment (positive, negative, or all)
+        timeframe_days: Number of days to look back
+        post_type: Filter by type (post, comment, reply, review, or None for all)
+        limit: Maximum number of posts to return
+        sort_by: Sort results by (timestamp, sentiment_score, upvotes)
+
+    Returns:
+        Dictionary containing:
+        - filters: Applied filters
+        - count: Number of results
+        - posts: List of posts with full metadata
+    """
+    matches = await _fetch_top_matches(platform, sentiment, timeframe_days, post_type, limit, sort_by)
+    posts = [_post_from_metadata(match.metadata) for match in matches]
 
     return {
         "filters": {
@@ -121,3 +144,39 @@ async def fetch_recent_posts(
         "count": len(posts),
         "posts": posts
     }
+
+
+async def fetch_recent_posts_json(
+    platform: str = "all",
+    sentiment: str = "all",
+    timeframe_days: int = 7,
+    post_type: Optional[str] = None,
+    limit: int = 20,
+    sort_by: str = "timestamp"
+) -> str:
+    """
+    Fetch recent posts (see fetch_recent_posts) and return the response as JSON text.
+
+    The response is written incrementally, one post at a time, so the full
+    list of post dicts is never held in memory alongside its serialized form.
+    """
+    matches = await _fetch_top_matches(platform, sentiment, timeframe_days, post_type, limit, sort_by)
+
+    header = json_dumps({
+        "filters": {
+            "platform": platform,
+            "sentiment": sentiment,
+            "timeframe_days": timeframe_days,
+            "post_type": post_type,
+            "sort_by": sort_by
+        },
+        "count": len(matches)
+    })
+    buf = bytearray(header[:-1])
+    buf += b',"posts":['
+    for i, match in enumerate(matches):
+        if i:
+            buf += b','
+        buf += json_dumps(_post_from_metadata(match.metadata))
+    buf += b']}'
+    return buf.decode()
@@ -4,15 +4,50 @@ Search tools for semantic sentiment analysis queries
 
 import sys
 import os
+import asyncio
+import heapq
 from typing import Dict, List, Any, Optional
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import get_pinecone_index, generate_embedding
+from utils import get_pinecone_index, aquery_matches, aquery_namespaces
+from .cache import get_query_embedding
 import config
 
 
+async def _query_by_platform(
+    index,
+    query_embedding: List[float],
+    limit: int,
+    filter_dict: Dict[str, Any],
+    namespaces: Optional[List[str]] = None
+) -> List[Any]:
+    """
+    Query each known platform concurrently and merge the top `limit` matches by score.
+
+    Each per-platform query is restricted to one source_platform, plus one
+    query for any other platforms, so together they cover the whole index.
+    """
+    filters = [{**filter_dict, "source_platform": platform} for platform in config.SEARCH_PLATFORMS]
+    filters.append({**filter_dict, "source_platform": {"$nin": config.SEARCH_PLATFORMS}})
+
+    results = await asyncio.gather(*(
+        aquery_matches(
+            index,
+            namespaces=namespaces,
+            vector=query_embedding,
+            top_k=limit,
+            include_metadata=True,
+            filter=platform_filter
+        )
+        for platform_filter in filters
+    ))
+    return heapq.nlargest(
+        limit, (match for matches in results for match in matches), key=lambda m: m.score
+    )
+
+
 async def search_sentiment(
     query: str,
     platform: str = "all",
@@ -38,8 +73,8 @@ async def search_sentiment(
         - matches: List of matching posts with metadata
     """
 
-    # Generate query embedding
-    query_embedding = generate_embedding(query)
+    # Generate query embedding (cached; otherwise off the event loop, batched with concurrent searches)
+    query_embedding = await get_query_embedding(query)
 
     # Get Pinecone index
     index = get_pinecone_index(
@@ -60,22 +95,33 @@ async def search_sentiment(
             filter_dict["sentiment_label"] = "NEGATIVE"
 
     # Add timeframe filter if specified
+    cutoff_timestamp = None
     if timeframe_days:
         import time
         cutoff_timestamp = time.time() - (timeframe_days * 24 * 60 * 60)
         filter_dict["timestamp"] = {"$gte": cutoff_timestamp}
 
-    # Query Pinecone
-    results = index.query(
-        vector=query_embedding,
-        top_k=limit,
-        include_metadata=True,
-        filter=filter_dict if filter_dict else None
-    )
+    # Weekly namespaces: query every namespace the timeframe overlaps
+    namespaces = None
+    if config.PINECONE_WEEKLY_NAMESPACES:
+        namespaces = await aquery_namespaces(index, cutoff_timestamp)
+
+    # Query Pinecone (all platforms: one concurrent query per platform)
+    if platform == "all" and config.SEARCH_FANOUT_BY_PLATFORM:
+        top_matches = await _query_by_platform(index, query_embedding, limit, filter_dict, namespaces)
+    else:
+        top_matches = await aquery_matches(
+            index,
+            namespaces=namespaces,
+            vector=query_embedding,
+            top_k=limit,
+            include_metadata=True,
+            filter=filter_dict if filter_dict else None
+        )
 
     # Format results
     matches = []
-    for match in results.matches:
+    for match in top_matches:
         matches.append({
             "score": float(match.score),
             "text": match.metadata.get("text", ""),
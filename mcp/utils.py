@@ -9,34 +9,123 @@ Contains common functions for:
 """
 
 import os
+import re
+import sys
+import math
+import asyncio
 import json
 import time
 import hashlib
+import heapq
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-
+import sqlite3
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+
+import numpy as np
 import torch
 import torch.nn.functional as F
 from transformers import pipeline, AutoTokenizer, AutoModel
 from pinecone import Pinecone
 
+# Prefer the gRPC client (HTTP/2 + protobuf) when pinecone-client[grpc] is installed
+try:
+    from pinecone.grpc import PineconeGRPC
+    PINECONE_GRPC_AVAILABLE = True
+except ImportError:
+    PINECONE_GRPC_AVAILABLE = False
+
+# Faster JSON encode/decode for state files when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional Redis for daily sentiment rollups (see record_sentiment_rollups)
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Optional fast hashes for vector IDs (see VECTOR_ID_ALGO)
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Optional CPU inference accelerators for the sentiment model
+try:
+    from optimum.bettertransformer import BetterTransformer
+    BETTERTRANSFORMER_AVAILABLE = True
+except ImportError:
+    BETTERTRANSFORMER_AVAILABLE = False
+
+try:
+    import intel_extension_for_pytorch as ipex
+    IPEX_AVAILABLE = True
+except ImportError:
+    IPEX_AVAILABLE = False
+
 # Global singletons for models
 sentiment_analyzer = None
+sentiment_bf16 = False  # True when the sentiment model runs under CPU bf16 autocast
+sentiment_mode = ''  # Execution mode of the loaded sentiment model (part of its cache kind)
 embedding_model = None
 embedding_tokenizer = None
+embedding_dtype = torch.float32  # Weight dtype of the loaded embedding model
+embedding_mode = ''  # Execution mode of the loaded embedding model (part of its cache kind)
 location_extractor = None
 pinecone_client = None
+pinecone_indexes = {}
+rollup_redis = None
 
 # Model constants (shared across all scrapers)
 SENTIMENT_MODEL = 'cardiffnlp/twitter-roberta-base-sentiment-latest'  # 3-class: negative/neutral/positive
 SENTIMENT_MODEL_VERSION = 'v3'  # Track model version in metadata (v3 = sentiment + location)
 EMBEDDING_MODEL = 'intfloat/e5-base-v2'  # 768 dimensions
+E5_PREFIXES = {"query": "query: ", "passage": "passage: "}  # e5 expects every input to be prefixed
 LOCATION_MODEL = 'dslim/bert-base-NER'  # Named Entity Recognition for locations
-BATCH_SIZE = 96  # Max records per Pinecone batch
+DEVICE = 'cuda' if torch.cuda.is_available() else 'cpu'  # Device for all scraper models
+BATCH_SIZE = 100  # Vectors per Pinecone upsert request
+# Hash behind generate_vector_id: 'md5' (default), 'xxh128' or 'blake3'. Changing it changes every
+# vector ID, so existing vectors are no longer recognized as duplicates - only switch for a new index
+VECTOR_ID_ALGO = os.getenv('VECTOR_ID_ALGO', 'md5').lower()
+EMBEDDING_BATCH_SIZE = 64  # Texts per embedding forward pass during upload
+UPSERT_POOL_THREADS = 30  # Concurrent Pinecone upsert requests
+UPSERT_MAX_RETRIES = 3  # Re-sends of a failed upsert batch
+UPSERT_RETRY_BACKOFF = 1.0  # Seconds before the first re-send, doubled after each failure
+QUERY_POOL_THREADS = 16  # Pooled connections of the shared (REST) query index handle
+CHECK_EXISTS_WORKERS = 16  # Concurrent fetch requests in check_if_exists
+
+# Load the embedding model in half precision (bf16 where supported, else fp16 on GPU / float32 on CPU)
+EMBEDDING_HALF_PRECISION = os.getenv('EMBEDDING_HALF_PRECISION', 'true').lower() == 'true'
+
+# Compile the embedding model with torch.compile (first batches of each new shape are slower).
+# On GPU, "reduce-overhead" replays the forward pass as a CUDA graph per input shape
+ENABLE_TORCH_COMPILE = os.getenv('ENABLE_TORCH_COMPILE', 'false').lower() == 'true'
+
+# On GPU, pad token sequences to a multiple of this (64/128/.../512) so inputs fall into a
+# few fixed shapes and captured CUDA graphs are replayed instead of re-recorded
+EMBEDDING_PAD_MULTIPLE = 64 if DEVICE == 'cuda' else None
+
+# Intra-op threads for CPU inference, applied when a model is loaded (torch's default if unset)
+TORCH_NUM_THREADS = os.getenv('TORCH_NUM_THREADS')
 
 # US States for location validation
-US_STATES = {
+US_STATES = frozenset({
     'alabama', 'alaska', 'arizona', 'arkansas', 'california', 'colorado', 'connecticut',
     'delaware', 'florida', 'georgia', 'hawaii', 'idaho', 'illinois', 'indiana', 'iowa',
     'kansas', 'kentucky', 'louisiana', 'maine', 'maryland', 'massachusetts', 'michigan',
@@ -45,55 +134,337 @@ US_STATES = {
     'oklahoma', 'oregon', 'pennsylvania', 'rhode island', 'south carolina', 'south dakota',
     'tennessee', 'texas', 'utah', 'vermont', 'virginia', 'washington', 'west virginia',
     'wisconsin', 'wyoming', 'dc', 'district of columbia'
-}
+})
 
-US_STATE_ABBR = {
+US_STATE_ABBR = frozenset({
     'al', 'ak', 'az', 'ar', 'ca', 'co', 'ct', 'de', 'fl', 'ga', 'hi', 'id', 'il', 'in',
     'ia', 'ks', 'ky', 'la', 'me', 'md', 'ma', 'mi', 'mn', 'ms', 'mo', 'mt', 'ne', 'nv',
     'nh', 'nj', 'nm', 'ny', 'nc', 'nd', 'oh', 'ok', 'or', 'pa', 'ri', 'sc', 'sd', 'tn',
     'tx', 'ut', 'vt', 'va', 'wa', 'wv', 'wi', 'wy', 'dc'
-}
+})
+
+# Lower-case state names and abbreviations, for a single membership test
+US_STATE_NAMES_AND_ABBR = US_STATES | US_STATE_ABBR
+
+# Cheap pre-filter for extract_location: a state can only be detected if the text
+# mentions a state name (any case) or an upper-case state abbreviation
+_STATE_MENTION_RE = re.compile(
+    r'(?i:\b(?:' + '|'.join(re.escape(state) for state in sorted(US_STATES, key=len, reverse=True)) + r')\b)'
+    r'|\b(?:' + '|'.join(abbr.upper() for abbr in sorted(US_STATE_ABBR)) + r')\b'
+)
+
+
+# Persistent inference cache (see InferenceCache); set INFERENCE_CACHE_PATH='' to disable
+INFERENCE_CACHE_PATH = os.getenv(
+    'INFERENCE_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.inference_cache.sqlite')
+)
+INFERENCE_CACHE_MAX_ENTRIES = 200000
+INFERENCE_CACHE_EVICT_INTERVAL = 1000  # inserted rows between size checks
+INFERENCE_CACHE_TIMEOUT = 30.0  # seconds to wait for another process's write lock
+
+# Redis holding daily per-platform sentiment rollups read by get_sentiment_summary;
+# empty (the default) disables them
+SENTIMENT_ROLLUP_REDIS_URL = os.getenv('SENTIMENT_ROLLUP_REDIS_URL', '')
+ROLLUP_KEY_PREFIX = 'ttime:agg'
+ROLLUP_FIELDS = ('count', 'pos', 'neg', 'score_sum')
+
+
+# ============================================================================
+# Inference Cache
+# ============================================================================
+
+class InferenceCache:
+    """
+    SQLite-backed cache of model outputs keyed by a hash of the input text.
+
+    Persists across scraper runs, so texts seen before (reposts, the overlap
+    window of incremental scrapes) skip sentiment, NER, and embedding inference.
+    Values are JSON by default; callers may pass their own encode/decode (e.g.
+    raw float32 bytes for embeddings).
+    """
+
+    def __init__(self, path: str, max_entries: int = INFERENCE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # Check the size on the first write, then every INFERENCE_CACHE_EVICT_INTERVAL rows
+        self._inserts_since_evict = INFERENCE_CACHE_EVICT_INTERVAL
+        self._lock = threading.Lock()
+        # The file is shared by the scrapers, the MCP server and the digest agent: WAL lets
+        # readers proceed during a write, and writers wait longer before giving up
+        self._conn = sqlite3.connect(path, timeout=INFERENCE_CACHE_TIMEOUT, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "kind TEXT NOT NULL, key BLOB NOT NULL, value TEXT NOT NULL, "
+            "accessed_at REAL NOT NULL, PRIMARY KEY (kind, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        """Cache key for a text."""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def get_many(self, kind: str, keys: List[bytes], decode=json.loads) -> Dict[bytes, Any]:
+        """Look up cached values for the given keys; missing keys are omitted."""
+        found = {}
+        # The connection context commits, or rolls back so a failed write releases its lock
+        with self._lock, self._conn:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM cache WHERE kind = ? AND key IN ({placeholders})",
+                    [kind, *chunk]
+                ).fetchall()
+                found.update((key, decode(value)) for key, value in rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE cache SET accessed_at = ? WHERE kind = ? AND key = ?",
+                    [(now, kind, key) for key in found]
+                )
+        return found
+
+    def set_many(self, kind: str, items: Dict[bytes, Any], encode=json.dumps):
+        """
+        Store values. Every INFERENCE_CACHE_EVICT_INTERVAL inserted rows, the least
+        recently used entries beyond max_entries are evicted.
+        """
+        if not items:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (kind, key, value, accessed_at) VALUES (?, ?, ?, ?)",
+                [(kind, key, encode(value), now) for key, value in items.items()]
+            )
+            self._inserts_since_evict += len(items)
+            if self._inserts_since_evict < INFERENCE_CACHE_EVICT_INTERVAL:
+                return
+            self._inserts_since_evict = 0
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+
+inference_cache = None
+
+
+def get_inference_cache() -> Optional[InferenceCache]:
+    """Get the shared inference cache, or None if disabled or unavailable."""
+    global inference_cache
+    if inference_cache is None and INFERENCE_CACHE_PATH:
+        try:
+            inference_cache = InferenceCache(INFERENCE_CACHE_PATH)
+        except sqlite3.Error as e:
+            print(f"Inference cache unavailable: {e}")
+            return None
+    return inference_cache
+
+
+def cached_inference(kind: str, texts: List[str], infer_func, encode=json.dumps, decode=json.loads) -> List[Any]:
+    """
+    Run infer_func only on texts without a cached result and stitch results back.
+
+    Args:
+        kind: Cache namespace (include the model version and execution mode, e.g.
+            int8 or bf16, so results from a different model or mode are not served)
+        texts: Input texts
+        infer_func: Function mapping a list of texts to a list of results
+        encode: Function serializing a result for storage
+        decode: Function restoring a stored result
+
+    Returns:
+        List of results, in input order
+    """
+    cache = get_inference_cache()
+    if cache is None:
+        return infer_func(texts)
+
+    # A cache failure (e.g. a locked database) must never fail the inference itself
+    keys = [InferenceCache.key(text) for text in texts]
+    try:
+        cached = cache.get_many(kind, list(set(keys)), decode=decode)
+    except Exception as e:
+        print(f"Inference cache read failed: {e}", file=sys.stderr)
+        cached = {}
+
+    # Each distinct missing text is inferred once, even if it repeats in texts
+    first_index = {}
+    for i, key in enumerate(keys):
+        if key not in cached:
+            first_index.setdefault(key, i)
+    miss_indices = list(first_index.values())
+    if miss_indices:
+        miss_results = infer_func([texts[i] for i in miss_indices])
+        new_entries = {}
+        for i, result in zip(miss_indices, miss_results):
+            new_entries[keys[i]] = result
+        try:
+            cache.set_many(kind, new_entries, encode=encode)
+        except Exception as e:
+            print(f"Inference cache write failed: {e}", file=sys.stderr)
+        cached.update(new_entries)
+
+    return [cached[key] for key in keys]
 
 
 # ============================================================================
 # Model Initialization
 # ============================================================================
 
-def init_sentiment_analyzer():
-    """Initialize the sentiment analysis pipeline."""
-    global sentiment_analyzer
+def _float_logits_hook(module, inputs, outputs):
+    """Cast bf16 logits back to float32 so the pipeline can convert them to numpy."""
+    outputs.logits = outputs.logits.float()
+    return outputs
+
+
+def _set_torch_threads():
+    """Apply TORCH_NUM_THREADS, if set, before loading a model."""
+    if TORCH_NUM_THREADS:
+        torch.set_num_threads(int(TORCH_NUM_THREADS))
+
+
+def init_sentiment_analyzer(quantize: bool = False):
+    """
+    Initialize the sentiment analysis pipeline.
+
+    On CPU, the model is converted to BetterTransformer (fused attention kernels)
+    when optimum is installed, and optimized for bf16 with Intel Extension for
+    PyTorch when it is installed.
+
+    Args:
+        quantize: On CPU, use dynamic int8 quantization of the Linear layers
+            instead of the BetterTransformer/bf16 path
+    """
+    global sentiment_analyzer, sentiment_bf16, sentiment_mode
     if sentiment_analyzer is None:
+        _set_torch_threads()
         print("Loading sentiment analysis model...")
         sentiment_analyzer = pipeline(
             "sentiment-analysis",
             model=SENTIMENT_MODEL,
-            device=0 if torch.cuda.is_available() else -1
+            device=0 if DEVICE == 'cuda' else -1
         )
+
+        mode = ['cuda-fp16' if DEVICE == 'cuda' else 'cpu']
+        if quantize and DEVICE == 'cpu':
+            sentiment_analyzer.model = torch.quantization.quantize_dynamic(
+                sentiment_analyzer.model.eval(), {torch.nn.Linear}, dtype=torch.qint8
+            )
+            mode.append('int8')
+            print("Sentiment model quantized to int8")
+        elif DEVICE == 'cpu':
+            model = sentiment_analyzer.model.eval()
+            if BETTERTRANSFORMER_AVAILABLE:
+                try:
+                    model = BetterTransformer.transform(model)
+                    mode.append('bt')
+                    print("Sentiment model converted to BetterTransformer")
+                except Exception as e:
+                    print(f"BetterTransformer conversion skipped: {e}")
+            if IPEX_AVAILABLE:
+                model = ipex.optimize(model, dtype=torch.bfloat16)
+                model.register_forward_hook(_float_logits_hook)
+                sentiment_bf16 = True
+                mode.append('bf16')
+                print("Sentiment model optimized with IPEX (bf16)")
+            sentiment_analyzer.model = model
+        sentiment_mode = '-'.join(mode)
     return sentiment_analyzer
 
 
+def _sentiment_autocast():
+    """Autocast context for sentiment inference (fp16 on GPU, bf16 on CPU when IPEX is enabled)."""
+    if DEVICE == 'cuda':
+        return torch.autocast("cuda", dtype=torch.float16)
+    return torch.autocast("cpu", dtype=torch.bfloat16, enabled=sentiment_bf16)
+
+
+def _embedding_autocast():
+    """Autocast context for embedding inference, matching the model's weight dtype."""
+    return torch.autocast(DEVICE, dtype=embedding_dtype, enabled=embedding_dtype != torch.float32)
+
+
+def _select_embedding_dtype() -> torch.dtype:
+    """
+    Pick the embedding model's weight dtype.
+
+    Normalized e5 embeddings are insensitive to half-precision rounding, and
+    half-size weights double the encoder's effective memory bandwidth. CPUs
+    without native bf16 stay in float32, since fp16 matmuls are emulated there.
+    """
+    if not EMBEDDING_HALF_PRECISION:
+        return torch.float32
+    if DEVICE == 'cuda':
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    bf16_check = getattr(torch.ops.mkldnn, '_is_mkldnn_bf16_supported', None)
+    if bf16_check is not None and bf16_check():
+        return torch.bfloat16
+    return torch.float32
+
+
+def _to_device(encoded_input) -> Dict[str, torch.Tensor]:
+    """Move tokenizer output to DEVICE, via pinned memory with async copies on GPU."""
+    if DEVICE == 'cpu':
+        return dict(encoded_input)
+    return {k: v.pin_memory().to(DEVICE, non_blocking=True) for k, v in encoded_input.items()}
+
+
 def init_embedding_model():
     """Initialize the embedding model."""
-    global embedding_model, embedding_tokenizer
+    global embedding_model, embedding_tokenizer, embedding_dtype, embedding_mode
     if embedding_model is None:
+        _set_torch_threads()
         print("Loading embedding model...")
+        embedding_dtype = _select_embedding_dtype()
         embedding_tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL)
-        embedding_model = AutoModel.from_pretrained(EMBEDDING_MODEL)
-        if torch.cuda.is_available():
-            embedding_model = embedding_model.to('cuda')
+        embedding_model = AutoModel.from_pretrained(EMBEDDING_MODEL, torch_dtype=embedding_dtype).to(DEVICE).eval()
+        embedding_mode = f"{DEVICE}-{str(embedding_dtype).replace('torch.', '')}"
+        if ENABLE_TORCH_COMPILE and hasattr(torch, 'compile'):
+            try:
+                # GPU shapes are bucketed (EMBEDDING_PAD_MULTIPLE), so compile them statically
+                compiled_model = torch.compile(embedding_model, mode="reduce-overhead", dynamic=DEVICE == 'cpu')
+                _warm_up_embedding_model(compiled_model)
+                embedding_model = compiled_model
+                embedding_mode += '-compiled'
+            except Exception as e:
+                print(f"torch.compile unavailable, using eager embedding model: {e}")
     return embedding_model, embedding_tokenizer
 
 
+def _warm_up_embedding_model(model, runs: int = 3):
+    """
+    Run a compiled embedding model on each expected single-text input shape.
+
+    Compilation (and, on GPU, CUDA graph recording) happens on the first few
+    calls per shape; doing it at load keeps it off the first queries and
+    surfaces compile errors while the eager model can still be used instead.
+    """
+    lengths = range(EMBEDDING_PAD_MULTIPLE, 513, EMBEDDING_PAD_MULTIPLE) if EMBEDDING_PAD_MULTIPLE else [16]
+    with torch.inference_mode(), _embedding_autocast():
+        for length in lengths:
+            dummy = torch.ones((1, length), dtype=torch.long, device=DEVICE)
+            for _ in range(runs):
+                model(input_ids=dummy, attention_mask=dummy)
+
+
 def init_location_extractor():
     """Initialize the location extraction NER pipeline."""
     global location_extractor
     if location_extractor is None:
+        _set_torch_threads()
         print("Loading location extraction model...")
         location_extractor = pipeline(
             "ner",
             model=LOCATION_MODEL,
             aggregation_strategy="simple",
-            device=0 if torch.cuda.is_available() else -1
+            device=0 if DEVICE == 'cuda' else -1
         )
     return location_extractor
 
@@ -107,58 +478,218 @@ def init_pinecone(api_key: str):
     """
     global pinecone_client
     if pinecone_client is None:
-        print("Initializing Pinecone client...")
-        pinecone_client = Pinecone(api_key=api_key)
+        if PINECONE_GRPC_AVAILABLE:
+            print("Initializing Pinecone gRPC client...")
+            pinecone_client = PineconeGRPC(api_key=api_key)
+        else:
+            print("Initializing Pinecone client...")
+            pinecone_client = Pinecone(api_key=api_key)
     return pinecone_client
 
 
-def get_pinecone_index(index_name: str, api_key: str):
+def get_pinecone_index(index_name: str, api_key: str, pool_threads: int = None):
     """
     Get a Pinecone index object.
 
+    The index handle is cached per index name (and REST pool size) so
+    repeated calls reuse the same connection instead of reopening it. The
+    REST client gets a connection pool of pool_threads connections; the gRPC
+    client multiplexes requests over one channel, so pool_threads is ignored.
+
     Args:
         index_name: Name of the Pinecone index
         api_key: Pinecone API key
+        pool_threads: Optional REST connection pool size (default QUERY_POOL_THREADS)
 
     Returns:
         Pinecone Index object
     """
-    pc = init_pinecone(api_key)
-    return pc.Index(index_name)
+    if PINECONE_GRPC_AVAILABLE:
+        pool_threads = None
+    elif pool_threads is None:
+        pool_threads = QUERY_POOL_THREADS
+
+    key = (index_name, pool_threads)
+    index = pinecone_indexes.get(key)
+    if index is None:
+        pc = init_pinecone(api_key)
+        if pool_threads is None:
+            index = pc.Index(index_name)
+        else:
+            index = pc.Index(index_name, pool_threads=pool_threads)
+        pinecone_indexes[key] = index
+    return index
+
+
+async def aquery(index, **kwargs):
+    """
+    Run a Pinecone index.query without blocking the event loop.
 
+    pinecone-client is synchronous, so the query runs in a worker thread.
 
-# ============================================================================
-# Sentiment Analysis
-# ============================================================================
+    Args:
+        index: Pinecone Index object
+        **kwargs: Arguments for index.query
 
-def mean_pooling(model_output, attention_mask):
-    """Mean pooling for sentence embeddings."""
-    token_embeddings = model_output[0]
-    input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
-    return torch.sum(token_embeddings * input_mask_expanded, 1) / torch.clamp(input_mask_expanded.sum(1), min=1e-9)
+    Returns:
+        The query response
+    """
+    return await asyncio.to_thread(index.query, **kwargs)
 
 
-def analyze_sentiment(text: str) -> Dict[str, Any]:
+async def aquery_matches(index, namespaces: Optional[Sequence[str]] = None, **kwargs) -> List[Any]:
     """
-    Analyze sentiment of text using 3-class model (negative/neutral/positive).
+    Run a Pinecone query, optionally across several namespaces, and return its matches.
+
+    With namespaces, each namespace is queried concurrently and the best top_k
+    matches across all of them are kept.
 
     Args:
-        text: Input text to analyze
+        index: Pinecone Index object
+        namespaces: Optional namespaces to query (default namespace only if None)
+        **kwargs: Arguments for index.query (must include top_k)
 
     Returns:
-        Dictionary with sentiment label, score, and sentiment_value
-        - label: 'NEGATIVE', 'NEUTRAL', or 'POSITIVE'
-        - score: Confidence score (0-1)
-        - sentiment_value: Normalized score (-1 to +1)
+        List of matches, best score first when merged across namespaces
     """
-    analyzer = init_sentiment_analyzer()
+    if namespaces is None:
+        return (await aquery(index, **kwargs)).matches
+    results = await asyncio.gather(*(
+        aquery(index, namespace=namespace, **kwargs) for namespace in namespaces
+    ))
+    return heapq.nlargest(
+        kwargs["top_k"], (match for result in results for match in result.matches), key=lambda m: m.score
+    )
 
-    # Truncate text if too long (model limit is 512 tokens)
-    if len(text) > 500:
-        text = text[:500]
 
-    result = analyzer(text)[0]
+async def aquery_namespaces(
+    index,
+    start_timestamp: Optional[float] = None,
+    end_timestamp: Optional[float] = None
+) -> List[str]:
+    """
+    Get the namespaces a query must cover when vectors are namespaced by week.
+
+    The default namespace is always included, since it still holds vectors
+    written before weekly namespaces were enabled. Without a window start,
+    every namespace in the index is returned.
+
+    Args:
+        index: Pinecone Index object
+        start_timestamp: Optional window start (Unix timestamp)
+        end_timestamp: Optional window end (Unix timestamp, defaults to now)
+
+    Returns:
+        List of namespace names
+    """
+    if start_timestamp is None:
+        stats = await asyncio.to_thread(index.describe_index_stats)
+        return sorted(set(stats.namespaces) | {""})
+    if end_timestamp is None:
+        end_timestamp = time.time()
+    return [""] + weekly_namespaces_between(start_timestamp, end_timestamp)
+
+
+async def aquery_time_window(
+    index,
+    filter_dict: Dict[str, Any],
+    start_timestamp: float,
+    end_timestamp: float,
+    top_k: int = 10000,
+    splits: int = 8,
+    max_depth: int = 4,
+    metadata_fields: Optional[Sequence[str]] = None,
+    namespaces: Optional[Sequence[str]] = None
+) -> List[Any]:
+    """
+    Fetch every match with a timestamp in [start_timestamp, end_timestamp].
+
+    Metadata-only scans query with a dummy vector, and a single query is capped
+    at top_k matches. When a window comes back full it is split into `splits`
+    sub-windows that are queried concurrently, recursively, so results are not
+    silently truncated at the cap.
+
+    pinecone-client cannot project metadata server-side, so when
+    metadata_fields is given each match's metadata is trimmed to those keys as
+    soon as its query returns, rather than holding every field of every match
+    until all sub-windows finish.
+
+    With namespaces, every namespace is scanned concurrently and the matches
+    are concatenated.
+
+    Args:
+        index: Pinecone Index object
+        filter_dict: Metadata filter without the timestamp condition
+        start_timestamp: Window start (Unix timestamp, inclusive)
+        end_timestamp: Window end (Unix timestamp, inclusive)
+        top_k: Maximum matches per query
+        splits: Number of sub-windows a full window is split into
+        max_depth: Maximum number of times a window is split
+        metadata_fields: Optional metadata keys to keep on each match
+        namespaces: Optional namespaces to scan (default namespace only if None)
+
+    Returns:
+        List of matches (with metadata) from all sub-windows
+    """
+    async def query_window(namespace: str, lo: float, hi: float, inclusive_hi: bool, depth: int) -> List[Any]:
+        window_filter = dict(filter_dict)
+        window_filter["timestamp"] = {"$gte": lo, "$lte" if inclusive_hi else "$lt": hi}
+        results = await aquery(
+            index,
+            vector=[0.0] * 768,  # Dummy vector
+            top_k=top_k,
+            include_values=False,
+            include_metadata=True,
+            filter=window_filter,
+            namespace=namespace
+        )
+        if metadata_fields is not None:
+            for match in results.matches:
+                metadata = match.metadata or {}
+                match.metadata = {key: metadata[key] for key in metadata_fields if key in metadata}
+        if len(results.matches) < top_k or depth >= max_depth:
+            return results.matches
+
+        # Window is full: split it and query the pieces concurrently
+        step = (hi - lo) / splits
+        bounds = [lo + i * step for i in range(splits)] + [hi]
+        pieces = await asyncio.gather(*(
+            query_window(namespace, bounds[i], bounds[i + 1], inclusive_hi and i == splits - 1, depth + 1)
+            for i in range(splits)
+        ))
+        return [match for piece in pieces for match in piece]
+
+    if namespaces is None:
+        namespaces = [""]
+    pieces = await asyncio.gather(*(
+        query_window(namespace, start_timestamp, end_timestamp, True, 0) for namespace in namespaces
+    ))
+    return [match for piece in pieces for match in piece]
+
+
+# ============================================================================
+# Sentiment Analysis
+# ============================================================================
+
+def mean_pooling(model_output, attention_mask):
+    """
+    Mean pooling for sentence embeddings (float32).
+
+    Gathers only the non-padding token rows into a flat [N_valid, H] tensor and
+    averages each text's rows with embedding_bag, instead of multiplying a
+    [B, L, H] mask into the full token embeddings.
+    """
+    token_embeddings = model_output[0]
+    mask = attention_mask.bool()
+    valid_rows = token_embeddings[mask].float()
+    lengths = mask.sum(1)
+    offsets = torch.cumsum(lengths, 0) - lengths
+    indices = torch.arange(valid_rows.size(0), device=valid_rows.device)
+    return F.embedding_bag(indices, valid_rows, offsets, mode='mean')
+
 
+def _sentiment_from_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a sentiment pipeline result into the sentiment dictionary."""
     # Map 3-class labels to sentiment values
     # CardiffNLP model returns: 'negative', 'neutral', 'positive' (lowercase)
     label = result['label'].upper()
@@ -183,34 +714,53 @@ def analyze_sentiment(text: str) -> Dict[str, Any]:
     }
 
 
-def extract_location(text: str) -> Dict[str, Any]:
+def analyze_sentiment(text: str) -> Dict[str, Any]:
     """
-    Extract location information from text using NER.
-
-    Only returns location data if a state is detected (country-only is too broad).
+    Analyze sentiment of text using 3-class model (negative/neutral/positive).
 
     Args:
         text: Input text to analyze
 
     Returns:
-        Dictionary with location fields:
-        - location_city: Detected city name or None
-        - location_state: Detected state name or None
-        - location_country: Detected country or None
-        - location_raw: Original location mention or None
-        - location_confidence: NER confidence score (Python float) or None
+        Dictionary with sentiment label, score, and sentiment_value
+        - label: 'NEGATIVE', 'NEUTRAL', or 'POSITIVE'
+        - score: Confidence score (0-1)
+        - sentiment_value: Normalized score (-1 to +1)
     """
-    extractor = init_location_extractor()
+    return analyze_sentiment_batch([text])[0]
 
-    # Truncate text if too long
-    if len(text) > 500:
-        text = text[:500]
 
-    # Extract named entities
-    entities = extractor(text)
+def analyze_sentiment_batch(texts: List[str], batch_size: int = 32) -> List[Dict[str, Any]]:
+    """
+    Analyze sentiment of multiple texts in batched forward passes.
 
-    # Initialize result
-    location = {
+    Args:
+        texts: List of input texts to analyze
+        batch_size: Number of texts per forward pass
+
+    Returns:
+        List of sentiment dictionaries (see analyze_sentiment), in input order
+    """
+    if not texts:
+        return []
+
+    # Truncate text if too long (model limit is 512 tokens)
+    truncated = [text[:500] for text in texts]
+
+    # Load the model first: its execution mode is part of the cache kind
+    analyzer = init_sentiment_analyzer()
+
+    def infer(batch: List[str]) -> List[Dict[str, Any]]:
+        with _sentiment_autocast():
+            results = analyzer(batch, batch_size=batch_size, truncation=True)
+        return [_sentiment_from_result(result) for result in results]
+
+    return cached_inference(f"sentiment-{SENTIMENT_MODEL}-{sentiment_mode}", truncated, infer)
+
+
+def _empty_location() -> Dict[str, Any]:
+    """Location dictionary with no detected location."""
+    return {
         'location_city': None,
         'location_state': None,
         'location_country': None,
@@ -218,6 +768,11 @@ def extract_location(text: str) -> Dict[str, Any]:
         'location_confidence': None
     }
 
+
+def _location_from_entities(entities: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the location dictionary from NER entities (see extract_location)."""
+    location = _empty_location()
+
     # Track if we found a state
     found_state = False
 
@@ -229,7 +784,7 @@ def extract_location(text: str) -> Dict[str, Any]:
 
             # Check if it's a US state
             loc_lower = loc_text.lower()
-            if loc_lower in US_STATES or loc_lower in US_STATE_ABBR:
+            if loc_lower in US_STATE_NAMES_AND_ABBR:
                 location['location_state'] = loc_text.title()
                 location['location_country'] = 'USA'
                 location['location_raw'] = loc_text
@@ -246,96 +801,361 @@ def extract_location(text: str) -> Dict[str, Any]:
     # Only return location data if we found a state
     # Country-only or city-only is too broad/uncertain
     if not found_state:
-        return {
-            'location_city': None,
-            'location_state': None,
-            'location_country': None,
-            'location_raw': None,
-            'location_confidence': None
-        }
+        return _empty_location()
 
     return location
 
 
+def extract_location(text: str) -> Dict[str, Any]:
+    """
+    Extract location information from text using NER.
+
+    Only returns location data if a state is detected (country-only is too broad).
+
+    Args:
+        text: Input text to analyze
+
+    Returns:
+        Dictionary with location fields:
+        - location_city: Detected city name or None
+        - location_state: Detected state name or None
+        - location_country: Detected country or None
+        - location_raw: Original location mention or None
+        - location_confidence: NER confidence score (Python float) or None
+    """
+    return extract_locations_batch([text])[0]
+
+
+def extract_locations_batch(texts: List[str], batch_size: int = 64) -> List[Dict[str, Any]]:
+    """
+    Extract location information from multiple texts using batched NER.
+
+    Texts that cannot mention a state are skipped; the rest go through the NER
+    pipeline together.
+
+    Args:
+        texts: List of input texts to analyze
+        batch_size: Number of texts per NER forward pass
+
+    Returns:
+        List of location dictionaries (see extract_location), in input order
+    """
+    locations = [_empty_location() for _ in texts]
+
+    # Truncate text if too long, and only keep texts that may mention a state
+    candidates = [
+        (i, text[:500]) for i, text in enumerate(texts)
+        if _STATE_MENTION_RE.search(text[:500])
+    ]
+    if not candidates:
+        return locations
+
+    def infer(batch: List[str]) -> List[Dict[str, Any]]:
+        extractor = init_location_extractor()
+        return [_location_from_entities(entities) for entities in extractor(batch, batch_size=batch_size)]
+
+    results = cached_inference(f"location-{LOCATION_MODEL}", [text for _, text in candidates], infer)
+    for (i, _), location in zip(candidates, results):
+        locations[i] = location
+
+    return locations
+
+
 # ============================================================================
 # Embeddings
 # ============================================================================
 
-def generate_embedding(text: str) -> List[float]:
+def _e5_prefixed(text: str, kind: str) -> str:
+    """Prepend the e5 input prefix ('query: ' or 'passage: ') unless already present."""
+    prefix = E5_PREFIXES[kind]
+    return text if text.startswith(prefix) else prefix + text
+
+
+def generate_embedding(text: str, kind: str = "query") -> np.ndarray:
     """
     Generate embedding vector for text.
 
     Args:
         text: Input text to embed
+        kind: 'query' for search queries, 'passage' for indexed documents
 
     Returns:
-        List of floats representing the embedding vector
+        float32 array holding the embedding vector
     """
     model, tokenizer = init_embedding_model()
 
-    # Tokenize and encode
+    # Tokenize and encode (a single text needs no padding, except to a GPU shape bucket)
     encoded_input = tokenizer(
-        text,
-        padding=True,
+        _e5_prefixed(text, kind),
+        padding=EMBEDDING_PAD_MULTIPLE is not None,
+        pad_to_multiple_of=EMBEDDING_PAD_MULTIPLE,
         truncation=True,
         max_length=512,
         return_tensors='pt'
     )
 
     # Move to GPU if available
-    if torch.cuda.is_available():
-        encoded_input = {k: v.to('cuda') for k, v in encoded_input.items()}
+    encoded_input = _to_device(encoded_input)
 
     # Generate embeddings
-    with torch.no_grad():
+    with torch.inference_mode(), _embedding_autocast():
         model_output = model(**encoded_input)
 
     # Apply mean pooling
-    embeddings = mean_pooling(model_output, encoded_input['attention_mask'])
+    embeddings = mean_pooling(model_output, encoded_input['attention_mask']).float()
 
     # Normalize embeddings
     embeddings = F.normalize(embeddings, p=2, dim=1)
 
-    return embeddings[0].cpu().tolist()
+    return embeddings[0].cpu().numpy()
+
+
+def _encode_embedding(embedding: np.ndarray) -> bytes:
+    """Serialize an embedding for the inference cache (raw float32)."""
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def _decode_embedding(value: bytes) -> np.ndarray:
+    """Restore an embedding stored by _encode_embedding."""
+    return np.frombuffer(value, dtype=np.float32)
+
+
+def generate_embeddings_batch(texts: List[str], batch_size: int = 32, kind: str = "query") -> np.ndarray:
+    """
+    Generate embedding vectors for several texts with batched forward passes.
+
+    Texts embedded before (including in earlier runs) are served from the
+    inference cache without tokenization or a forward pass.
+
+    Args:
+        texts: Input texts to embed
+        batch_size: Number of texts per forward pass
+        kind: 'query' for search queries, 'passage' for indexed documents
+
+    Returns:
+        float32 array of shape (len(texts), 768), rows in the same order as texts
+    """
+    if not texts:
+        return np.empty((0, 768), dtype=np.float32)
+
+    texts = [_e5_prefixed(text, kind) for text in texts]
+    # Load the model first: its execution mode is part of the cache kind
+    init_embedding_model()
+    return np.stack(cached_inference(
+        f"embedding-{EMBEDDING_MODEL}-{embedding_mode}",
+        texts,
+        lambda batch: _embed_prefixed_texts(batch, batch_size),
+        encode=_encode_embedding,
+        decode=_decode_embedding
+    ))
+
+
+def _embed_prefixed_texts(texts: List[str], batch_size: int) -> np.ndarray:
+    """Embed already-prefixed texts in length-sorted batches (see generate_embeddings_batch)."""
+    model, tokenizer = init_embedding_model()
+
+    # Tokenize everything once, then batch texts of similar length together so
+    # each batch pads to a length close to its own texts'
+    tokenized = tokenizer(texts, truncation=True, max_length=512)
+    input_ids = tokenized['input_ids']
+    order = np.argsort([len(ids) for ids in input_ids], kind='stable')
+
+    embeddings = np.empty((len(texts), 768), dtype=np.float32)
+    for i in range(0, len(texts), batch_size):
+        batch_order = order[i:i + batch_size]
+
+        # Pad the batch to its longest text (rounded up to a shape bucket on GPU)
+        encoded_input = tokenizer.pad(
+            {
+                'input_ids': [input_ids[j] for j in batch_order],
+                'attention_mask': [tokenized['attention_mask'][j] for j in batch_order]
+            },
+            padding='longest',
+            pad_to_multiple_of=EMBEDDING_PAD_MULTIPLE,
+            return_tensors='pt'
+        )
+
+        # Move to GPU if available
+        encoded_input = _to_device(encoded_input)
+
+        # Generate embeddings
+        with torch.inference_mode(), _embedding_autocast():
+            model_output = model(**encoded_input)
+
+        # Apply mean pooling (in float32) and normalize
+        batch_embeddings = mean_pooling(model_output, encoded_input['attention_mask']).float()
+        batch_embeddings = F.normalize(batch_embeddings, p=2, dim=1)
+
+        # Put embeddings back in input order
+        embeddings[batch_order] = batch_embeddings.cpu().numpy()
+
+    return embeddings
+
+
+# Query-time embedding coalescer (see agenerate_embedding)
+EMBEDDING_COALESCE_MAX_BATCH = int(os.getenv('EMBEDDING_COALESCE_MAX_BATCH', '16'))
+EMBEDDING_COALESCE_WINDOW = float(os.getenv('EMBEDDING_COALESCE_WINDOW_MS', '10')) / 1000  # seconds to wait for more queries before running a batch
+_embedding_queue = None
+_embedding_worker = None
+
+
+async def _embedding_batch_worker(queue: asyncio.Queue):
+    """Drain queued embedding requests in small batches and resolve their futures."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + EMBEDDING_COALESCE_WINDOW
+        while len(batch) < EMBEDDING_COALESCE_MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        try:
+            embeddings = await asyncio.to_thread(generate_embeddings_batch, [text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+
+async def agenerate_embedding(text: str) -> np.ndarray:
+    """
+    Generate an embedding without blocking the event loop.
+
+    Concurrent calls (e.g. parallel tool calls from an agent) arriving within
+    EMBEDDING_COALESCE_WINDOW are embedded together in one forward pass.
+
+    Args:
+        text: Input text to embed
+
+    Returns:
+        float32 array holding the embedding vector
+    """
+    global _embedding_queue, _embedding_worker
+    loop = asyncio.get_running_loop()
+    if _embedding_worker is None or _embedding_worker.done() or _embedding_worker.get_loop() is not loop:
+        _embedding_queue = asyncio.Queue()
+        _embedding_worker = loop.create_task(_embedding_batch_worker(_embedding_queue))
+
+    future = loop.create_future()
+    await _embedding_queue.put((text, future))
+    return await future
 
 
 # ============================================================================
 # Pinecone Operations
 # ============================================================================
 
+def _chunks(iterable, size: int):
+    """Yield successive tuples of up to `size` elements from an iterable."""
+    it = iter(iterable)
+    chunk = tuple(islice(it, size))
+    while chunk:
+        yield chunk
+        chunk = tuple(islice(it, size))
+
+
 def upsert_to_pinecone(
     index_name: str,
     vectors: List[Dict[str, Any]],
     api_key: str,
     namespace: str = "",
-    batch_size: int = None
+    batch_size: int = None,
+    pool_threads: int = None
 ) -> None:
     """
     Upsert vectors to Pinecone.
 
+    Batches are sent concurrently with async_req=True and awaited together.
+    A failed batch is re-sent with exponential backoff.
+
     Args:
         index_name: Name of the Pinecone index
         vectors: List of vector dictionaries with 'id', 'values', and 'metadata'
         api_key: Pinecone API key
         namespace: Optional namespace for organization
         batch_size: Optional batch size override
+        pool_threads: Optional number of concurrent upsert requests
     """
-    pc = init_pinecone(api_key)
-    index = pc.Index(index_name)
-
-    # Use default batch size if not specified
+    # Use defaults if not specified
     if batch_size is None:
         batch_size = BATCH_SIZE
+    if pool_threads is None:
+        pool_threads = UPSERT_POOL_THREADS
 
-    # Upsert in batches (max 96 records per batch per Pinecone docs)
-    for i in range(0, len(vectors), batch_size):
-        batch = vectors[i:i + batch_size]
-        index.upsert(vectors=batch, namespace=namespace)
-        time.sleep(0.5)  # Rate limiting
+    index = get_pinecone_index(index_name, api_key, pool_threads=pool_threads)
+
+    batches = [list(batch) for batch in _chunks(vectors, batch_size)]
+    async_results = [
+        index.upsert(vectors=batch, namespace=namespace, async_req=True)
+        for batch in batches
+    ]
+    for batch, async_result in zip(batches, async_results):
+        delay = UPSERT_RETRY_BACKOFF
+        for attempt in range(UPSERT_MAX_RETRIES + 1):
+            try:
+                # gRPC returns futures, REST returns ApplyResults
+                if hasattr(async_result, 'result'):
+                    async_result.result()
+                else:
+                    async_result.get()
+                break
+            except Exception as e:
+                if attempt == UPSERT_MAX_RETRIES:
+                    raise
+                print(f"Upsert of {len(batch)} vectors failed: {e}. Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                delay *= 2
+                async_result = index.upsert(vectors=batch, namespace=namespace, async_req=True)
 
     print(f"Upserted {len(vectors)} vectors to Pinecone")
 
 
+def weekly_namespace(timestamp: float) -> str:
+    """
+    Get the weekly Pinecone namespace for a timestamp.
+
+    Args:
+        timestamp: Unix timestamp
+
+    Returns:
+        Namespace name in the form 'week-YYYY-WW' (ISO year and week, UTC)
+    """
+    iso_year, iso_week, _ = datetime.fromtimestamp(timestamp, tz=timezone.utc).isocalendar()
+    return f"week-{iso_year}-{iso_week:02d}"
+
+
+def weekly_namespaces_between(start_timestamp: float, end_timestamp: float) -> List[str]:
+    """
+    Get the weekly Pinecone namespaces overlapping a time window.
+
+    Args:
+        start_timestamp: Unix timestamp of the window start
+        end_timestamp: Unix timestamp of the window end
+
+    Returns:
+        List of namespace names, oldest first
+    """
+    namespaces = []
+    timestamp = start_timestamp
+    while timestamp < end_timestamp:
+        namespaces.append(weekly_namespace(timestamp))
+        timestamp += 7 * 24 * 60 * 60
+    last_namespace = weekly_namespace(end_timestamp)
+    if last_namespace not in namespaces:
+        namespaces.append(last_namespace)
+    return namespaces
+
+
 def generate_vector_id(source_identifier: str, source_platform: str) -> str:
     """
     Generate a unique vector ID for deduplication.
@@ -345,16 +1165,23 @@ def generate_vector_id(source_identifier: str, source_platform: str) -> str:
         source_platform: Platform name (reddit, threads, consumer-affairs)
 
     Returns:
-        Unique vector ID (MD5 hash)
+        Unique vector ID (32 hex characters; MD5 unless VECTOR_ID_ALGO selects xxh128 or BLAKE3)
     """
-    combined = f"{source_platform}_{source_identifier}"
-    return hashlib.md5(combined.encode()).hexdigest()
+    combined = f"{source_platform}_{source_identifier}".encode()
+    if VECTOR_ID_ALGO == 'xxh128' and XXHASH_AVAILABLE:
+        return xxhash.xxh128(combined).hexdigest()
+    if VECTOR_ID_ALGO == 'blake3' and BLAKE3_AVAILABLE:
+        return blake3.blake3(combined).hexdigest(16)
+    return hashlib.md5(combined).hexdigest()
 
 
 def check_if_exists(index_name: str, vector_ids: List[str], api_key: str, namespace: str = "") -> List[str]:
     """
     Check which vector IDs already exist in Pinecone.
 
+    IDs are fetched in batches of 100, with up to CHECK_EXISTS_WORKERS
+    batches in flight at once.
+
     Args:
         index_name: Name of the Pinecone index
         vector_ids: List of vector IDs to check
@@ -364,28 +1191,34 @@ def check_if_exists(index_name: str, vector_ids: List[str], api_key: str, namesp
     Returns:
         List of existing vector IDs
     """
-    pc = init_pinecone(api_key)
-    index = pc.Index(index_name)
-
-    existing = []
+    index = get_pinecone_index(index_name, api_key)
     batch_size = 100
 
-    for i in range(0, len(vector_ids), batch_size):
-        batch = vector_ids[i:i + batch_size]
+    def fetch_existing(batch: List[str]) -> List[str]:
         try:
-            fetch_result = index.fetch(ids=batch, namespace=namespace)
-            existing.extend(fetch_result.vectors.keys())
+            return list(index.fetch(ids=batch, namespace=namespace).vectors.keys())
         except Exception as e:
             print(f"Error checking existence: {e}")
-            continue
+            return []
 
-    return existing
+    batches = [vector_ids[i:i + batch_size] for i in range(0, len(vector_ids), batch_size)]
+    if len(batches) <= 1:
+        return [vector_id for batch in batches for vector_id in fetch_existing(batch)]
+
+    with ThreadPoolExecutor(max_workers=min(CHECK_EXISTS_WORKERS, len(batches))) as pool:
+        return [vector_id for found in pool.map(fetch_existing, batches) for vector_id in found]
 
 
 # ============================================================================
 # State Management
 # ============================================================================
 
+# Pretty-printed like json.dump(indent=2); non-string keys are stringified as json does
+_ORJSON_FILE_OPTIONS = (
+    orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+) if ORJSON_AVAILABLE else 0
+
+
 def load_state(state_file: str) -> Dict[str, Any]:
     """
     Load state from JSON file.
@@ -398,6 +1231,9 @@ def load_state(state_file: str) -> Dict[str, Any]:
     """
     if os.path.exists(state_file):
         try:
+            if ORJSON_AVAILABLE:
+                with open(state_file, 'rb') as f:
+                    return orjson.loads(f.read())
             with open(state_file, 'r') as f:
                 return json.load(f)
         except Exception as e:
@@ -421,8 +1257,12 @@ def save_state(state_file: str, state: Dict[str, Any]) -> bool:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(state_file) if os.path.dirname(state_file) else '.', exist_ok=True)
         
-        with open(state_file, 'w') as f:
-            json.dump(state, f, indent=2)
+        if ORJSON_AVAILABLE:
+            with open(state_file, 'wb') as f:
+                f.write(orjson.dumps(state, option=_ORJSON_FILE_OPTIONS))
+        else:
+            with open(state_file, 'w') as f:
+                json.dump(state, f, indent=2)
         return True
     except Exception as e:
         print(f"Error saving state file: {e}")
@@ -444,14 +1284,33 @@ def save_json_file(file_path: str, data: Any) -> bool:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(file_path) if os.path.dirname(file_path) else '.', exist_ok=True)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=_ORJSON_FILE_OPTIONS))
+        else:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
         return True
     except Exception as e:
         print(f"Error saving JSON file: {e}")
         return False
 
 
+def json_dumps(data: Any) -> bytes:
+    """
+    Serialize data to compact JSON bytes (orjson when available).
+
+    Args:
+        data: Data to serialize
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode('utf-8')
+
+
 def format_json(data: Any, indent: int = 2) -> str:
     """
     Format data as pretty-printed JSON string.
@@ -463,6 +1322,9 @@ def format_json(data: Any, indent: int = 2) -> str:
     Returns:
         Formatted JSON string
     """
+    # orjson only supports 2-space indentation
+    if ORJSON_AVAILABLE and indent == 2:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
     return json.dumps(data, indent=indent, ensure_ascii=False)
 
 
@@ -476,18 +1338,35 @@ def process_and_upload_to_pinecone(
     index_name: str,
     api_key: str,
     metadata_creator_func,
-    logger: Optional[logging.Logger] = None
+    logger: Optional[logging.Logger] = None,
+    namespace_by_week: bool = False,
+    preprocess_func=None,
+    upsert_batch_size: int = None,
+    upsert_pool_threads: int = None,
+    metadata_batch_creator_func=None,
+    embedding_batch_size: int = None,
+    stored_ids: Optional[set] = None
 ) -> int:
     """
     Generic function to process data items and upload to Pinecone.
     
     Args:
-        data_items: List of data dictionaries with 'id', 'text', and 'sentiment' keys
+        data_items: List of data dictionaries with 'id', 'text', 'timestamp', and 'sentiment' keys
         source_platform: Platform name (reddit, consumer-affairs, etc.)
         index_name: Pinecone index name
         api_key: Pinecone API key
         metadata_creator_func: Function that takes an item dict and returns metadata dict
         logger: Optional logger instance
+        namespace_by_week: Write each vector to its weekly namespace (see weekly_namespace)
+        preprocess_func: Optional function called once with the list of new items
+            before metadata is created (e.g. batched location extraction)
+        upsert_batch_size: Optional vectors per upsert request
+        upsert_pool_threads: Optional number of concurrent upsert requests
+        metadata_batch_creator_func: Optional function that takes the list of new items
+            and returns their metadata dicts; used instead of metadata_creator_func
+        embedding_batch_size: Optional texts per embedding forward pass
+        stored_ids: Optional set that receives the source IDs of items now stored in
+            Pinecone (already present or upserted by this call); items that failed are left out
     
     Returns:
         Number of vectors successfully uploaded
@@ -500,19 +1379,39 @@ def process_and_upload_to_pinecone(
     if logger:
         logger.info(f"\nProcessing and uploading {len(data_items)} items...")
 
-    # Check for existing items to avoid duplicates
+    # Compute each item's vector ID and namespace once
     vector_ids = [generate_vector_id(item['id'], source_platform) for item in data_items]
-    existing_ids = check_if_exists(index_name, vector_ids, api_key)
+    namespaces = [
+        weekly_namespace(item['timestamp']) if namespace_by_week else "" for item in data_items
+    ]
+
+    # Group vector IDs by namespace (a single default namespace unless namespacing by week)
+    ids_by_namespace = {}
+    for vector_id, namespace in zip(vector_ids, namespaces):
+        ids_by_namespace.setdefault(namespace, []).append(vector_id)
+
+    # Check for existing items to avoid duplicates (including vectors written to the
+    # default namespace before weekly namespaces were enabled)
+    if namespace_by_week:
+        ids_by_namespace.setdefault("", []).extend(vector_ids)
+    existing_ids = set()
+    for namespace, namespace_ids in ids_by_namespace.items():
+        existing_ids.update(check_if_exists(index_name, namespace_ids, api_key, namespace=namespace))
 
     if existing_ids:
         if logger:
             logger.info(f"Found {len(existing_ids)} existing items, will skip those")
 
-    existing_ids_set = set(existing_ids)
-    new_items = [
-        item for item in data_items
-        if generate_vector_id(item['id'], source_platform) not in existing_ids_set
+    if stored_ids is not None:
+        stored_ids.update(
+            item['id'] for vector_id, item in zip(vector_ids, data_items) if vector_id in existing_ids
+        )
+    new_entries = [
+        (vector_id, namespace, item)
+        for vector_id, namespace, item in zip(vector_ids, namespaces, data_items)
+        if vector_id not in existing_ids
     ]
+    new_items = [item for _, _, item in new_entries]
 
     if not new_items:
         if logger:
@@ -522,57 +1421,147 @@ def process_and_upload_to_pinecone(
     if logger:
         logger.info(f"Processing {len(new_items)} new items...")
 
-    vectors = []
+    if preprocess_func is not None:
+        preprocess_func(new_items)
+
     error_count = 0
 
-    # Import tqdm if available, otherwise use plain iteration
-    try:
-        from tqdm import tqdm
-        items_iter = tqdm(new_items, desc="Generating embeddings")
-    except ImportError:
-        items_iter = new_items
+    # Embed all new items with batched forward passes
+    if logger:
+        logger.info("Generating embeddings...")
+    embeddings = generate_embeddings_batch(
+        [item['text'] for item in new_items],
+        batch_size=embedding_batch_size or EMBEDDING_BATCH_SIZE,
+        kind="passage"
+    )
 
-    for item in items_iter:
+    metadatas = [None] * len(new_items)
+    if metadata_batch_creator_func is not None:
         try:
-            # Generate embedding
-            embedding = generate_embedding(item['text'])
-
-            vector_id = generate_vector_id(item['id'], source_platform)
+            metadatas = metadata_batch_creator_func(new_items)
+        except Exception as e:
+            if logger:
+                logger.warning(f"Batch metadata creation failed, falling back to per-item: {e}")
 
-            # Use the provided metadata creator function
+    def build_vector(vector_id, item, embedding, metadata):
+        # Use the provided metadata creator function
+        if metadata is None:
             metadata = metadata_creator_func(item)
 
-            # Add text content to metadata (truncated)
-            metadata['text'] = item['text'][:1000]
+        # Add text content to metadata (truncated)
+        metadata['text'] = item['text'][:1000]
 
-            vectors.append({
-                'id': vector_id,
-                'values': embedding,
-                'metadata': metadata
-            })
+        # Pinecone takes plain lists; convert from float32 only here, at the upload boundary
+        return {'id': vector_id, 'values': embedding.tolist(), 'metadata': metadata}
 
-        except Exception as e:
-            if logger:
-                logger.error(f"Error processing item {item['id']}: {e}")
-            error_count += 1
-            continue
+    # Build all vectors in one pass; if any item fails, rebuild item by item to skip only the bad ones
+    entries = list(zip(new_entries, embeddings, metadatas))
+    try:
+        built = [
+            (namespace, item['id'], build_vector(vector_id, item, embedding, metadata))
+            for (vector_id, namespace, item), embedding, metadata in entries
+        ]
+    except Exception:
+        built = []
+        for (vector_id, namespace, item), embedding, metadata in entries:
+            try:
+                built.append((namespace, item['id'], build_vector(vector_id, item, embedding, metadata)))
+            except Exception as e:
+                if logger:
+                    logger.error(f"Error processing item {item['id']}: {e}")
+                error_count += 1
+
+    vectors_by_namespace = {}
+    item_ids_by_namespace = {}
+    for namespace, item_id, vector in built:
+        vectors_by_namespace.setdefault(namespace, []).append(vector)
+        item_ids_by_namespace.setdefault(namespace, []).append(item_id)
 
     # Upload to Pinecone
-    if vectors:
-        upsert_to_pinecone(
-            index_name=index_name,
-            vectors=vectors,
-            api_key=api_key
-        )
+    if vectors_by_namespace:
+        uploaded = 0
+        for namespace, vectors in vectors_by_namespace.items():
+            try:
+                upsert_to_pinecone(
+                    index_name=index_name,
+                    vectors=vectors,
+                    api_key=api_key,
+                    namespace=namespace,
+                    batch_size=upsert_batch_size,
+                    pool_threads=upsert_pool_threads
+                )
+            except Exception as e:
+                if logger:
+                    logger.error(f"Error uploading {len(vectors)} vectors to namespace '{namespace}': {e}")
+                error_count += len(vectors)
+                continue
+            record_sentiment_rollups(vectors, source_platform, logger)
+            if stored_ids is not None:
+                stored_ids.update(item_ids_by_namespace[namespace])
+            uploaded += len(vectors)
         if logger:
-            logger.info(f"\nSuccessfully processed and uploaded {len(vectors)} items")
-        return len(vectors)
+            logger.info(f"\nSuccessfully processed and uploaded {uploaded} items")
+        return uploaded
     else:
         if logger:
             logger.warning("\nNo vectors to upload")
         return 0
 
 
+# ============================================================================
+# Sentiment Rollups
+# ============================================================================
+
+def rollup_day(timestamp: float) -> str:
+    """Get the UTC day (YYYYMMDD) a timestamp's rollup counters belong to."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y%m%d')
+
+
+def get_rollup_redis():
+    """Get the Redis client for sentiment rollups, or None if rollups are disabled or unavailable."""
+    global rollup_redis
+    if rollup_redis is None and SENTIMENT_ROLLUP_REDIS_URL and REDIS_AVAILABLE:
+        rollup_redis = redis.Redis.from_url(SENTIMENT_ROLLUP_REDIS_URL)
+    return rollup_redis
+
+
+def record_sentiment_rollups(vectors: List[Dict[str, Any]], source_platform: str, logger: Optional[logging.Logger] = None):
+    """
+    Add newly uploaded vectors to the daily per-platform sentiment rollups.
+
+    Counters live at ttime:agg:{platform}:{yyyymmdd}:{count,pos,neg,score_sum}.
+    ttime:agg:since records the first day whose rollups are complete (the day
+    after rollups were first recorded), so readers can fall back to scanning
+    Pinecone for older windows.
+
+    Args:
+        vectors: Uploaded vectors with 'metadata' containing timestamp and sentiment
+        source_platform: Platform name
+        logger: Optional logger instance
+    """
+    client = get_rollup_redis()
+    if client is None or not vectors:
+        return
+
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.setnx(f"{ROLLUP_KEY_PREFIX}:since", rollup_day(time.time() + 86400))
+        pipe.sadd(f"{ROLLUP_KEY_PREFIX}:platforms", source_platform)
+        for vector in vectors:
+            metadata = vector['metadata']
+            prefix = f"{ROLLUP_KEY_PREFIX}:{source_platform}:{rollup_day(metadata['timestamp'])}"
+            pipe.incr(f"{prefix}:count")
+            if metadata.get('sentiment_label') == 'POSITIVE':
+                pipe.incr(f"{prefix}:pos")
+            elif metadata.get('sentiment_label') == 'NEGATIVE':
+                pipe.incr(f"{prefix}:neg")
+            pipe.incrbyfloat(f"{prefix}:score_sum", metadata.get('sentiment_score', 0))
+        pipe.execute()
+    except Exception as e:
+        if logger:
+            logger.warning(f"Failed to record sentiment rollups: {e}")
+
+
 # ============================================================================
 # Logging
 # ============================================================================
@@ -628,6 +1617,205 @@ def log_post_processing(logger: logging.Logger, post_data: Dict[str, Any], comme
     logger.info(f"└─ Sentiment: {post_data['sentiment']['label']} ({sentiment_score:+.2f}) {sentiment_emoji}")
 
 
+def iso_datetimes(timestamps: List[float]) -> List[str]:
+    """
+    Convert Unix timestamps to ISO 8601 strings in one vectorized pass.
+
+    Args:
+        timestamps: Unix timestamps
+
+    Returns:
+        List of 'YYYY-MM-DDTHH:MM:SSZ' strings (UTC, second precision)
+    """
+    seconds = np.asarray(timestamps, dtype=np.float64).astype(np.int64).astype('datetime64[s]')
+    return np.datetime_as_string(seconds, timezone='UTC').tolist()
+
+
+# ============================================================================
+# Seen-ID Bloom Filter
+# ============================================================================
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter; one slice of a ScalableBloomFilter.
+
+    Membership tests can return false positives (at roughly `error_rate` while
+    under `capacity`) but never false negatives.
+    """
+
+    _HEADER = struct.Struct('<QQQI')  # capacity, num_bits, count, num_hashes
+
+    def __init__(self, capacity: int = 200000, error_rate: float = 1e-4):
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        """Add a key to the filter."""
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def is_full(self) -> bool:
+        """True once the filter holds `capacity` keys (its error rate rises beyond that)."""
+        return self.count >= self.capacity
+
+    def to_bytes(self) -> bytes:
+        """Serialize the filter (header + bit array)."""
+        return self._HEADER.pack(self.capacity, self.num_bits, self.count, self.num_hashes) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: memoryview, offset: int = 0) -> Tuple['BloomFilter', int]:
+        """Read a filter written by to_bytes(); returns it and the offset after it."""
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.num_bits, bloom.count, bloom.num_hashes = cls._HEADER.unpack_from(data, offset)
+        offset += cls._HEADER.size
+        size = (bloom.num_bits + 7) // 8
+        bloom.bits = bytearray(data[offset:offset + size])
+        if len(bloom.bits) != size:
+            raise ValueError("truncated file")
+        return bloom, offset + size
+
+
+class ScalableBloomFilter:
+    """
+    Growable Bloom filter for remembering which source IDs were already uploaded.
+
+    When the newest slice reaches its capacity a new slice is chained, with
+    GROWTH times the capacity and TIGHTENING times the error rate, so the
+    overall false-positive rate stays below error_rate / (1 - TIGHTENING)
+    however many IDs are added. Never returns false negatives.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+    _MAGIC = b'SBF1'
+    _HEADER = struct.Struct('<QdI')  # initial capacity, initial error rate, slice count
+
+    def __init__(self, capacity: int = 200000, error_rate: float = 1e-4):
+        self.initial_capacity = capacity
+        self.initial_error_rate = error_rate
+        self.slices = [BloomFilter(capacity, error_rate)]
+
+    def add(self, key: str):
+        """Add a key, chaining a new slice if the newest one is full."""
+        if self.slices[-1].is_full:
+            n = len(self.slices)
+            self.slices.append(BloomFilter(
+                self.initial_capacity * self.GROWTH ** n,
+                self.initial_error_rate * self.TIGHTENING ** n
+            ))
+        self.slices[-1].add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in bloom for bloom in self.slices)
+
+    def __len__(self) -> int:
+        return sum(len(bloom) for bloom in self.slices)
+
+    def save(self, path: str) -> bool:
+        """Write the filter to disk; returns True if successful."""
+        try:
+            with open(path, 'wb') as f:
+                f.write(self._MAGIC)
+                f.write(self._HEADER.pack(self.initial_capacity, self.initial_error_rate, len(self.slices)))
+                for bloom in self.slices:
+                    f.write(bloom.to_bytes())
+            return True
+        except Exception as e:
+            print(f"Error saving Bloom filter: {e}")
+            return False
+
+    @classmethod
+    def load(cls, path: str) -> Optional['ScalableBloomFilter']:
+        """Read a filter written by save(), or None if missing or unreadable."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                data = memoryview(f.read())
+            if bytes(data[:4]) != cls._MAGIC:
+                raise ValueError("not a Bloom filter file")
+            sbf = cls.__new__(cls)
+            sbf.initial_capacity, sbf.initial_error_rate, num_slices = cls._HEADER.unpack_from(data, 4)
+            offset = 4 + cls._HEADER.size
+            sbf.slices = []
+            for _ in range(num_slices):
+                bloom, offset = BloomFilter.from_bytes(data, offset)
+                sbf.slices.append(bloom)
+            if not sbf.slices:
+                raise ValueError("no slices")
+            return sbf
+        except Exception as e:
+            print(f"Error loading Bloom filter: {e}")
+            return None
+
+
+def load_seen_ids(state_file: str) -> ScalableBloomFilter:
+    """
+    Load the Bloom filter of uploaded source IDs stored next to a state file.
+
+    Args:
+        state_file: Path to the scraper's state file
+
+    Returns:
+        The saved filter, or a new empty one
+    """
+    return ScalableBloomFilter.load(state_file + '.bloom') or ScalableBloomFilter()
+
+
+def save_seen_ids(state_file: str, seen: ScalableBloomFilter) -> bool:
+    """Save the Bloom filter of uploaded source IDs next to a state file."""
+    return seen.save(state_file + '.bloom')
+
+
+# ============================================================================
+# Rate Limiting
+# ============================================================================
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Allows bursts of up to `capacity` calls, refilling at `rate` tokens per second.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then take them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
 # ============================================================================
 # Utility Functions
 # ============================================================================